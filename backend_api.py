@@ -3,7 +3,7 @@ FastAPI backend API for KhetSetu Web UI
 This connects the frontend to the main.py logic.
 
 Installation:
-    pip install fastapi uvicorn python-multipart
+    pip install fastapi uvicorn python-multipart orjson msgspec
 
 Usage:
     uvicorn backend_api:app --host 127.0.0.1 --port 5001 --reload
@@ -12,85 +12,208 @@ Then update app.js to use:
     const API_ENDPOINT = 'http://localhost:5001/ask';
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 import asyncio
+import hashlib
 import json
+import msgspec
+import orjson
+import os
 import sys
+from cachetools import TTLCache
 from datetime import datetime
-from typing import Optional, List, Dict
+from contextlib import aclosing, asynccontextmanager
+from typing import Annotated, Optional, List, Dict
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-# NOTE: Import KhetSetu only when needed to avoid startup errors
-# from main import KhetSetu
+# Full tracebacks for handled errors are printed only when KHETSETU_DEBUG=1
+_DEBUG = os.getenv("KHETSETU_DEBUG") == "1"
+if _DEBUG:
+    import traceback
 
-app = FastAPI(title="KhetSetu Backend API", version="1.0.0")
+# Import KhetSetu once at startup so the first request doesn't pay for it;
+# if its dependencies are missing the API still starts and /ask returns 503
+try:
+    from main import KhetSetu
+except ImportError:
+    KhetSetu = None
+
+async def _warmup() -> None:
+    """Build the shared kernel in a worker thread so boot isn't blocked."""
+    # Import here to avoid startup issues
+    from src.config import warmup
+    try:
+        await asyncio.to_thread(warmup)
+    except Exception as e:
+        # The first request retries the build
+        print(f"Warning: Kernel warmup failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up the kernel at boot and release the pooled HTTP connections on shutdown."""
+    warmup_task = asyncio.create_task(_warmup()) if KhetSetu is not None else None
+    yield
+    if warmup_task is not None and not warmup_task.done():
+        warmup_task.cancel()
+    # Import here to avoid startup issues
+    try:
+        from kernel_functions import close_resources
+    except ImportError:
+        return
+    await close_resources()
+
+
+# ORJSONResponse serializes plain dicts in a single pass, skipping
+# jsonable_encoder and response_model re-validation
+app = FastAPI(
+    title="KhetSetu Backend API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+# Compress larger responses (agent outputs and final answers are long text)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 # Configure CORS
+# Explicit lists (no wildcards); set CORS_ALLOW_ORIGINS to a comma-separated
+# list for deployments. Defaults to the local web UI.
+CORS_ALLOW_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv(
+        "CORS_ALLOW_ORIGINS", "http://localhost:8000,http://127.0.0.1:8000"
+    ).split(",")
+    if origin.strip()
+]
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # In production, specify exact origins
+    allow_origins=CORS_ALLOW_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type", "authorization"],
 )
 
 # ============================================================================
 # Request/Response Models
 # ============================================================================
 
-class QueryRequest(BaseModel):
-    user_input: str = Field(..., min_length=1, description="User's agricultural query")
-    image_base64: Optional[str] = Field(None, description="Optional base64-encoded image data (without data: prefix)")
-    image_url: Optional[str] = Field(None, description="Optional public URL to the image")
+# msgspec structs: decoding and validation happen in a single pass over the
+# raw request body, without building pydantic models per request
+
+class QueryRequest(msgspec.Struct):
+    user_input: Annotated[str, msgspec.Meta(min_length=1, description="User's agricultural query")]
+    image_base64: Annotated[Optional[str], msgspec.Meta(description="Optional base64-encoded image data (without data: prefix)")] = None
+    image_url: Annotated[Optional[str], msgspec.Meta(description="Optional public URL to the image")] = None
 
-class TokenInfo(BaseModel):
+class TokenInfo(msgspec.Struct):
     prompt_tokens: int
     completion_tokens: int
 
-class AgentResponse(BaseModel):
+class AgentResponse(msgspec.Struct):
     name: str
     status: str
     output: str
     tokens: TokenInfo
 
-class TokenSummary(BaseModel):
+class TokenSummary(msgspec.Struct):
     total_prompt_tokens: int
     total_completion_tokens: int
     total_cost_usd: float
 
-class QueryResponse(BaseModel):
+class QueryResponse(msgspec.Struct):
     status: str
     agents: List[AgentResponse]
     final_answer: str
     token_summary: TokenSummary
     message: Optional[str] = None
+    cached: bool = False  # Served from the response cache; no tokens were spent
 
-class HealthResponse(BaseModel):
+class HealthResponse(msgspec.Struct):
     status: str
     service: str
     timestamp: str
 
+
+_QUERY_DECODER = msgspec.json.Decoder(QueryRequest)
+
+
+async def decode_query_request(request: Request) -> QueryRequest:
+    """
+    Decode and validate a QueryRequest from the raw request body.
+
+    Args:
+        request: Incoming HTTP request
+
+    Returns:
+        Decoded QueryRequest
+
+    Raises:
+        HTTPException: 422 if the body is not valid JSON or fails validation
+    """
+    try:
+        return _QUERY_DECODER.decode(await request.body())
+    except (msgspec.ValidationError, msgspec.DecodeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+def _schema_ref(name: str) -> dict:
+    return {"content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{name}"}}}}
+
+
+# Request body and response docs for the msgspec structs above
+_QUERY_BODY = {"requestBody": {"required": True, **_schema_ref("QueryRequest")}}
+
+
+def custom_openapi() -> dict:
+    """Build the OpenAPI schema, adding the msgspec struct definitions."""
+    if app.openapi_schema:
+        return app.openapi_schema
+    schema = get_openapi(title=app.title, version=app.version, routes=app.routes)
+    _, components = msgspec.json.schema_components(
+        (QueryRequest, QueryResponse, HealthResponse),
+        ref_template="#/components/schemas/{name}"
+    )
+    schema.setdefault("components", {}).setdefault("schemas", {}).update(components)
+    app.openapi_schema = schema
+    return schema
+
+
+app.openapi = custom_openapi
+
 # ============================================================================
 # API Endpoints
 # ============================================================================
 
-@app.get('/health', response_model=HealthResponse)
+# Response schemas are listed under `responses` so they still appear in the
+# OpenAPI schema without FastAPI re-validating the trusted internal dict
+
+# Reused encoder for the tiny, fixed-shape health payload
+_HEALTH_ENC = msgspec.json.Encoder()
+
+@app.get('/health', responses={200: _schema_ref("HealthResponse")})
 async def health_check():
     """Health check endpoint"""
-    return HealthResponse(
-        status="healthy",
-        service="KhetSetu Backend API",
-        timestamp=datetime.now().isoformat()
+    return Response(
+        _HEALTH_ENC.encode({
+            "status": "healthy",
+            "service": "KhetSetu Backend API",
+            "timestamp": datetime.now().isoformat()
+        }),
+        media_type="application/json"
     )
 
 
-@app.post('/ask', response_model=QueryResponse)
-async def ask_query(request: QueryRequest):
+@app.post('/ask', responses={200: _schema_ref("QueryResponse")}, openapi_extra=_QUERY_BODY)
+async def ask_query(request: QueryRequest = Depends(decode_query_request)):
     """
     Main endpoint to process agricultural queries with optional image analysis.
     
@@ -132,6 +255,8 @@ async def ask_query(request: QueryRequest):
     }
     
     Note: Backwards compatible - requests with only user_input still work.
+    A repeated text query answered from the response cache has "cached": true
+    and zero token usage.
     """
     try:
         user_input = request.user_input.strip()
@@ -140,46 +265,242 @@ async def ask_query(request: QueryRequest):
             raise HTTPException(status_code=400, detail="user_input field is required")
         
         # Process the query with optional image fields
-        response = await process_query_async(
+        result = await process_query_async(
             user_input,
             image_base64=request.image_base64,
             image_url=request.image_url
         )
-        return response
+        return ORJSONResponse(result)
         
     except HTTPException:
         raise
     except Exception as e:
         print(f"Error processing query: {e}")
-        import traceback
-        traceback.print_exc()
+        if _DEBUG:
+            traceback.print_exc()
         
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@app.post('/ask-async')
-async def ask_query_async_endpoint():
+@app.post('/ask-stream', openapi_extra=_QUERY_BODY)
+async def ask_query_stream(
+    request: QueryRequest = Depends(decode_query_request),
+    tokens: bool = False
+):
+    """
+    Stream query progress as Server-Sent Events.
+
+    Accepts the same body as /ask. Emits an `agent` event with each agent
+    response as soon as that agent finishes, then a final `result` event
+    carrying the same payload /ask returns. With `?tokens=true`, `delta`
+    events also carry each agent's text as it is generated; token usage is
+    not reported for those turns.
+
+    Example stream:
+        event: delta
+        data: {"name": "ForecastAgent", "text": "Tomorrow"}
+
+        event: agent
+        data: {"name": "ForecastAgent", "status": "complete", "output": "...", "tokens": {...}}
+
+        event: result
+        data: {"status": "success", "agents": [...], "final_answer": "...", "token_summary": {...}}
+    """
+    user_input = request.user_input.strip()
+    if not user_input:
+        raise HTTPException(status_code=400, detail="user_input field is required")
+    if KhetSetu is None:
+        raise HTTPException(status_code=503, detail="KhetSetu system is unavailable")
+
+    async def event_stream():
+        khet_setu_system = await acquire_khetsetu()
+        # Closed explicitly so a client disconnect ends the agent chat before
+        # the instance goes back to the pool
+        events = khet_setu_system.stream_web_query(
+            user_input,
+            image_base64=request.image_base64,
+            image_url=request.image_url,
+            stream_tokens=tokens
+        )
+        try:
+            async with aclosing(events):
+                async for event in events:
+                    yield f"event: {event['event']}\ndata: {orjson.dumps(event['data']).decode()}\n\n"
+        finally:
+            release_khetsetu(khet_setu_system)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+
+@app.post('/ask-async', openapi_extra=_QUERY_BODY)
+async def ask_query_async_endpoint(request: QueryRequest = Depends(decode_query_request)):
     """
     Async endpoint (returns immediately, results available via /results/{task_id})
     
-    Requires task queue like Celery in production.
-    This is a placeholder for advanced implementations.
+    Enqueues the query on the Celery worker defined in worker.py and returns
+    202 with the task id. Requires a running broker (Redis by default).
+    
+    Response:
+    {
+        "task_id": "0b6f6c0e-..."
+    }
     """
-    raise HTTPException(
-        status_code=501,
-        detail="Async endpoint not yet implemented. Use /ask instead."
-    )
+    user_input = request.user_input.strip()
+
+    if not user_input:
+        raise HTTPException(status_code=400, detail="user_input field is required")
+
+    try:
+        # Import here so the API still starts when Celery is not installed
+        from worker import run_khetsetu
+
+        # Publishing to the broker is blocking network I/O
+        task = await asyncio.to_thread(
+            run_khetsetu.delay,
+            user_input,
+            image_base64=request.image_base64,
+            image_url=request.image_url
+        )
+    except ImportError:
+        raise HTTPException(
+            status_code=501,
+            detail="Async endpoint requires celery[redis]. Use /ask instead."
+        )
+    except Exception as e:
+        print(f"Error enqueueing query: {e}")
+        raise HTTPException(status_code=503, detail=f"Task queue unavailable: {str(e)}")
+
+    return ORJSONResponse({"task_id": task.id}, status_code=202)
+
+
+@app.get('/results/{task_id}')
+async def get_task_result(task_id: str):
+    """
+    Poll the result of a query submitted to /ask-async.
+    
+    Response (pending):
+    {
+        "task_id": "0b6f6c0e-...",
+        "status": "PENDING"
+    }
+
+    Response (finished):
+    {
+        "task_id": "0b6f6c0e-...",
+        "status": "SUCCESS",
+        "result": { ...same shape as /ask... }
+    }
+    """
+    try:
+        from celery.result import AsyncResult
+        from worker import celery_app
+    except ImportError:
+        raise HTTPException(
+            status_code=501,
+            detail="Async endpoint requires celery[redis]. Use /ask instead."
+        )
+
+    task_result = AsyncResult(task_id, app=celery_app)
+
+    try:
+        # Reading state/result goes to the result backend, keep it off the event loop
+        state = await asyncio.to_thread(lambda: task_result.state)
+        response = {"task_id": task_id, "status": state}
+
+        if state == "SUCCESS":
+            response["result"] = await asyncio.to_thread(lambda: task_result.result)
+        elif state == "FAILURE":
+            response["message"] = str(await asyncio.to_thread(lambda: task_result.result))
+    except Exception as e:
+        print(f"Error reading task result: {e}")
+        raise HTTPException(status_code=503, detail=f"Task queue unavailable: {str(e)}")
+
+    return ORJSONResponse(response)
 
 
 # ============================================================================
 # Helper Functions
 # ============================================================================
 
+# Reusable KhetSetu instances. Building one creates the kernel, services and
+# agents, so they are kept per process and handed out one request at a time
+# (an instance holds per-query state such as its chat and token tracker).
+KHETSETU_POOL_SIZE = int(os.getenv("KHETSETU_POOL_SIZE", "4"))
+_khetsetu_pool: Optional[asyncio.Queue] = None
+_khetsetu_created = 0
+
+
+async def acquire_khetsetu():
+    """
+    Take a KhetSetu instance from the pool, creating one if the pool is not full.
+
+    Returns:
+        KhetSetu instance; hand it back with release_khetsetu()
+    """
+    global _khetsetu_pool, _khetsetu_created
+    if _khetsetu_pool is None:
+        _khetsetu_pool = asyncio.Queue()
+    if _khetsetu_pool.empty() and _khetsetu_created < KHETSETU_POOL_SIZE:
+        _khetsetu_created += 1
+        try:
+            return KhetSetu()
+        except Exception:
+            _khetsetu_created -= 1
+            raise
+    return await _khetsetu_pool.get()
+
+
+def release_khetsetu(khet_setu_system) -> None:
+    """
+    Return a KhetSetu instance to the pool.
+
+    An instance whose chat is still marked active (an agent run that was not
+    shut down) would fail its next reset(), so it is replaced by a new one.
+    """
+    global _khetsetu_created
+    if khet_setu_system.agent_group_chat.is_active:
+        try:
+            khet_setu_system = KhetSetu()
+        except Exception as e:
+            print(f"Error replacing busy KhetSetu instance: {e}")
+            _khetsetu_created -= 1
+            return
+    _khetsetu_pool.put_nowait(khet_setu_system)
+
+
+# Successful text-only answers keyed by a hash of the query. Per process; a
+# shared store such as Redis would be needed to share hits across workers.
+_RESPONSE_CACHE = TTLCache(maxsize=10_000, ttl=3600)
+
+
+def _cache_key(user_input: str) -> bytes:
+    return hashlib.blake2b(user_input.encode(), digest_size=16).digest()
+
+
+def _cached_response(result: dict) -> dict:
+    """Copy a response for the cache, marked as cached and with zero token usage."""
+    no_tokens = {"prompt_tokens": 0, "completion_tokens": 0}
+    return {
+        **result,
+        "agents": [{**agent, "tokens": no_tokens} for agent in result["agents"]],
+        "token_summary": {
+            "total_prompt_tokens": 0,
+            "total_completion_tokens": 0,
+            "total_cost_usd": 0.0
+        },
+        "cached": True
+    }
+
+
 async def process_query_async(
     user_input: str,
     image_base64: Optional[str] = None,
     image_url: Optional[str] = None
-) -> QueryResponse:
+) -> dict:
     """
     Process a query asynchronously and return structured response.
     
@@ -191,41 +512,56 @@ async def process_query_async(
         image_url (Optional[str]): Public URL to an image
         
     Returns:
-        QueryResponse: Structured response matching frontend API contract
+        dict: Structured response matching the QueryResponse frontend API contract
+
+    Raises:
+        HTTPException: 503 if the KhetSetu system could not be imported
     """
+    if KhetSetu is None:
+        raise HTTPException(status_code=503, detail="KhetSetu system is unavailable")
+
+    # Image queries depend on the image, so only text queries are cached
+    cache_key = None if image_base64 or image_url else _cache_key(user_input)
+    if cache_key is not None:
+        cached = _RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
     try:
-        # Import here to avoid startup issues if dependencies are missing
-        from main import KhetSetu
-        
-        # Create KhetSetu instance and process query
-        khet_setu_system = KhetSetu()
-        
-        # Run the async main method with image fields
-        result = await khet_setu_system.process_web_query(
-            user_input,
-            image_base64=image_base64,
-            image_url=image_url
-        )
+        khet_setu_system = await acquire_khetsetu()
+        try:
+            # Run the async main method with image fields
+            result = await khet_setu_system.process_web_query(
+                user_input,
+                image_base64=image_base64,
+                image_url=image_url
+            )
+        finally:
+            release_khetsetu(khet_setu_system)
+
+        if cache_key is not None and result.get("status") == "success":
+            # Hits report no usage, so spend is only counted for the real run
+            _RESPONSE_CACHE[cache_key] = _cached_response(result)
         
-        return QueryResponse(**result)
+        return result
         
     except Exception as e:
         print(f"Error in process_query_async: {e}")
-        import traceback
-        traceback.print_exc()
+        if _DEBUG:
+            traceback.print_exc()
         
         # Return error response
-        return QueryResponse(
-            status="error",
-            message=f"Failed to process query: {str(e)}",
-            agents=[],
-            final_answer="Sorry, I encountered an error processing your request. Please try again.",
-            token_summary=TokenSummary(
-                total_prompt_tokens=0,
-                total_completion_tokens=0,
-                total_cost_usd=0.0
-            )
-        )
+        return {
+            "status": "error",
+            "message": f"Failed to process query: {str(e)}",
+            "agents": [],
+            "final_answer": "Sorry, I encountered an error processing your request. Please try again.",
+            "token_summary": {
+                "total_prompt_tokens": 0,
+                "total_completion_tokens": 0,
+                "total_cost_usd": 0.0
+            }
+        }
 
 
 # ============================================================================
@@ -307,9 +643,14 @@ if __name__ == '__main__':
     ╚════════════════════════════════════════════════════════╝
     """)
     
+    # uvloop + httptools replace the pure-Python event loop and HTTP parser;
+    # an import string is required for uvicorn to spawn multiple workers
     uvicorn.run(
-        app,
+        "backend_api:app",
         host='127.0.0.1',
         port=5001,
-        log_level='info'
+        loop='uvloop',
+        http='httptools',
+        workers=int(os.getenv("UVICORN_WORKERS", os.cpu_count() or 1)),
+        log_level='warning'
     )
@@ -1,7 +1,9 @@
 import os 
 import asyncio
-import json
-import requests
+import re
+import orjson
+import httpx
+from collections import OrderedDict
 from dotenv import load_dotenv
 from openai import AsyncOpenAI
 from datetime import datetime, timedelta, timezone
@@ -14,66 +16,237 @@ from semantic_kernel.functions import  kernel_function
 # Load .env file 
 load_dotenv()
 
+# Shared HTTP client: pooled keep-alive connections avoid a fresh TCP+TLS
+# handshake on every geocoding/weather/OpenAI call. Closed via close_resources().
+# The 30 s timeout is meant for the weather, geocoding and NASA APIs.
+HTTP = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_connections=100,
+        max_keepalive_connections=20,
+        keepalive_expiry=30.0
+    ),
+    timeout=30,
+    http2=True
+)
+
+
+_openai_client: "AsyncOpenAI | None" = None
+
+# Non-streamed completions of up to 8000 max_tokens can take far longer than the
+# pool's 30 s, so OpenAI requests override it with the SDK's default 600 s
+_OPENAI_TIMEOUT = httpx.Timeout(600.0, connect=10.0)
+
+
+def get_openai_client() -> AsyncOpenAI:
+    """Return the process-wide AsyncOpenAI client, creating it on first use.
+
+    The client sends its requests over the shared HTTP connection pool, with
+    its own longer timeout.
+    """
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            http_client=HTTP,
+            timeout=_OPENAI_TIMEOUT
+        )
+    return _openai_client
+
+
+async def close_resources() -> None:
+    """Flush pending weather log writes and close the shared HTTP clients."""
+    global _openai_client
+    await _flush_weather_log()
+    _openai_client = None
+    await HTTP.aclose()
+
+
+# Weather results are appended to this file in batches by a background flush
+# so disk I/O never runs on the event loop
+WEATHER_LOG_PATH = './datasets/weather_data.txt'
+_WEATHER_LOG_BATCH = 32
+_WEATHER_LOG_DELAY = 0.5  # seconds
+_weather_log_buffer: list[str] = []
+_weather_log_task: "asyncio.Task | None" = None
+
+
+def _write_lines(path: str, lines: list[str]) -> None:
+    with open(path, "a") as file:
+        file.writelines(lines)
+
+
+async def _flush_weather_log() -> None:
+    global _weather_log_buffer
+    if not _weather_log_buffer:
+        return
+    lines, _weather_log_buffer = _weather_log_buffer, []
+    await asyncio.to_thread(_write_lines, WEATHER_LOG_PATH, lines)
+
+
+async def _delayed_flush() -> None:
+    global _weather_log_task
+    try:
+        await asyncio.sleep(_WEATHER_LOG_DELAY)
+        await _flush_weather_log()
+    finally:
+        _weather_log_task = None
+
+
+def _log_weather(record) -> None:
+    """Queue a weather record for the batched append to WEATHER_LOG_PATH."""
+    global _weather_log_task
+    _weather_log_buffer.append(f"{record}\n")
+    if len(_weather_log_buffer) >= _WEATHER_LOG_BATCH:
+        asyncio.ensure_future(_flush_weather_log())
+    elif _weather_log_task is None:
+        _weather_log_task = asyncio.ensure_future(_delayed_flush())
+
+
+# Geocoding results keyed by normalized location. Entries are tasks so that
+# concurrent lookups of the same place share a single OpenCage request.
+_GEOCODE_CACHE_SIZE = 1024
+_geocode_cache: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+
+
+async def _fetch_coords(location: str) -> tuple[float, float]:
+    url = "https://api.opencagedata.com/geocode/v1/json"
+    params = {"q": location, "key": os.getenv("GEO_API_KEY")}
+    response = await HTTP.get(url, params=params)
+    data = orjson.loads(response.content)
+    coords = data["results"][0]["geometry"]
+    return coords["lat"], coords["lng"]
+
+
+async def _geocode(location: str) -> tuple[float, float]:
+    """
+    Resolve a location name to (lat, lng), caching results in an LRU.
+
+    Args:
+        location: Free-text location name
+
+    Returns:
+        Tuple of (latitude, longitude)
+    """
+    key = location.strip().lower()
+    task = _geocode_cache.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_fetch_coords(location.strip()))
+        _geocode_cache[key] = task
+        if len(_geocode_cache) > _GEOCODE_CACHE_SIZE:
+            _geocode_cache.popitem(last=False)
+    else:
+        _geocode_cache.move_to_end(key)
+    try:
+        # Shield so one cancelled caller doesn't cancel the shared lookup
+        return await asyncio.shield(task)
+    except Exception:
+        # Don't cache failures
+        if _geocode_cache.get(key) is task:
+            del _geocode_cache[key]
+        raise
+
+
+# NASA POWER responses keyed by (grid cell, years, day). Monthly history does
+# not change intraday, so each place/range is fetched at most once a day.
+_NASA_CACHE_SIZE = 1024
+_nasa_cache: "OrderedDict[tuple, str]" = OrderedDict()
+
+
+def _grid(value: float) -> float:
+    """Snap a coordinate to the 0.5 degree grid of the NASA POWER data."""
+    return round(value * 2) / 2
+
+
 # Connect to the NASA POWER API to get accurate weather data in the chosen location
 # returns Total Precipitation (T2M) and Temperature at 2 Meters (T2M)
 
 @kernel_function
 async def get_NASA_data (location: str, start_year: int, end_year: int):
-    api_key= os.getenv("GEO_API_KEY")
-    url = f"https://api.opencagedata.com/geocode/v1/json"
-    params = {"q": location, "key":api_key}
-    response = requests.get(url, params = params)
-    data = response.json()
-    coords = data["results"][0]["geometry"]
-    
-    def blocking_fetch():
+    lat, lng = await _geocode(location)
+    # Nearby names ("New York", "New York City") share one grid cell and entry
+    lat, lng = _grid(lat), _grid(lng)
+
+    key = (lat, lng, start_year, end_year, datetime.now(timezone.utc).date())
+    data = _nasa_cache.get(key)
+    if data is not None:
+        _nasa_cache.move_to_end(key)
+        return data
+
     # Connect to NASA POWER API with url using the above parameters
-        base_url = (
-            f"https://power.larc.nasa.gov/api/temporal/monthly/point?"
-            f"start={start_year}&end={end_year}"
-            f"&latitude={coords['lat']}&longitude={coords['lng']}"
-            f"&community=ag"
-            f"&parameters=T2M,PRECTOT"
-            f"&format=csv&header=false"
-        )
-        
-        # Make the actual request to NASA API
-        nasa_response = requests.get(base_url)
-        if nasa_response.status_code != 200:
-            return f"Error: {nasa_response.status_code}, {nasa_response.text}"
+    base_url = (
+        f"https://power.larc.nasa.gov/api/temporal/monthly/point?"
+        f"start={start_year}&end={end_year}"
+        f"&latitude={lat}&longitude={lng}"
+        f"&community=ag"
+        f"&parameters=T2M,PRECTOT"
+        f"&format=csv&header=false"
+    )
+
+    # Make the actual request to NASA API
+    nasa_response = await HTTP.get(base_url)
+    if nasa_response.status_code != 200:
+        return f"Error: {nasa_response.status_code}, {nasa_response.text}"
 
     # Write results to a .txt file  (including the header)
-        data = nasa_response.text
-        with open('./datasets/weather_data.txt', "a") as file:
-            file.write(f"{data}\n")
-        return data
-    data = await asyncio.get_event_loop().run_in_executor(None, blocking_fetch)
+    data = nasa_response.text
+    _log_weather(data)
+
+    # Entries from previous days age out through the LRU
+    _nasa_cache[key] = data
+    if len(_nasa_cache) > _NASA_CACHE_SIZE:
+        _nasa_cache.popitem(last=False)
     return data 
         
-@kernel_function
-async def get_forecast(location: str, forecast_date):  # date: YYYY-MM-DD
-    url = f"https://api.opencagedata.com/geocode/v1/json"
-    api_key=os.getenv("GEO_API_KEY")
-    params = {"q": location, "key":api_key}
-    response = requests.get(url, params = params)
-    data = response.json()
-    coords = data["results"][0]["geometry"]
-    lat = coords["lat"]
-    lon = coords["lng"]
-
-    now = datetime.now()
+def _forecast_day(forecast_date) -> str:
+    """Resolve a forecast date (days from today, or a date) to "YYYY-MM-DD"."""
     if isinstance(forecast_date, datetime):
-        forecast_date = forecast_date.strftime("%Y-%m-%d")
-    elif isinstance(forecast_date, bool): # 1 or 0
-        forecast_date = int(forecast_date)
-    elif (isinstance(forecast_date, str) and "-" not in forecast_date): # "1" or "0"
+        return forecast_date.strftime("%Y-%m-%d")
+    if isinstance(forecast_date, str) and forecast_date.lstrip("-").isdigit(): # "1" or "0"
         forecast_date = int(forecast_date)
-    elif isinstance(forecast_date,int):
-        if forecast_date == 0:
-            forecast_date = now
-        elif forecast_date != 0:
-            forecast_date = datetime.now(timezone.utc).date() + timedelta(days=forecast_date)
-        forecast_date = forecast_date.strftime("%Y-%m-%d")
+    if isinstance(forecast_date, int): # includes True/False
+        day = datetime.now(timezone.utc).date() + timedelta(days=forecast_date)
+        return day.strftime("%Y-%m-%d")
+    return forecast_date
+
+
+def _summarize_day(forecast_date: str, day_forecasts: list) -> dict:
+    """Aggregate one day's 3-hour forecasts in a single pass."""
+    t_sum = h_sum = w_sum = 0.0
+    t_max = float("-inf")
+    t_min = float("inf")
+    conditions = []
+    for f in day_forecasts:
+        main = f["main"]
+        temp = main["temp"]
+        t_sum += temp
+        if temp > t_max:
+            t_max = temp
+        if temp < t_min:
+            t_min = temp
+        h_sum += main["humidity"]
+        w_sum += f["wind"]["speed"]
+        conditions.append(f["weather"][0]["description"])
+    count = len(day_forecasts)
+
+    return {
+        "date": forecast_date,
+        "temp_avg": round(t_sum / count, 1),
+        "temp_max": round(t_max, 1),
+        "temp_min": round(t_min, 1),
+        "weather": conditions[0],
+        "humidity_avg": round(h_sum / count, 0),
+        "wind_speed_kph": round(w_sum / count * 3.6, 1),
+        "conditions": conditions
+    }
+
+
+@kernel_function
+async def get_forecast(location: str, forecast_date):  # date: YYYY-MM-DD, days from today, or a list of either
+    lat, lon = await _geocode(location)
+
+    # A list asks for several days from the one API response
+    batched = isinstance(forecast_date, (list, tuple))
+    forecast_dates = [_forecast_day(d) for d in (forecast_date if batched else [forecast_date])]
 
     api_key = os.getenv("OPEN_WEATHER_API_KEY")
     # Use the 2.5 API which is free, instead of 3.0 which requires subscription
@@ -86,11 +259,11 @@ async def get_forecast(location: str, forecast_date):  # date: YYYY-MM-DD
         "cnt": 40  # Get 5 days of forecast (8 per day)
     }
 
-    response = requests.get(url, params=params)
+    response = await HTTP.get(url, params=params)
     if response.status_code != 200:
         return f"Error: {response.status_code}, {response.text}"
 
-    data = response.json()
+    data = orjson.loads(response.content)
 
     # Find the matching forecast day - aggregate 3-hour forecasts by date
     forecasts_by_date = {}
@@ -99,42 +272,66 @@ async def get_forecast(location: str, forecast_date):  # date: YYYY-MM-DD
         if dt not in forecasts_by_date:
             forecasts_by_date[dt] = []
         forecasts_by_date[dt].append(item)
-    
-    # Get the closest date to the requested forecast_date
-    if forecast_date not in forecasts_by_date:
-        available_dates = list(forecasts_by_date.keys())
-        if not available_dates:
-            return f"No forecast data available. API Returns: {data}"
-        # Use the first available date if exact match not found
-        forecast_date = available_dates[0]
-    
-    day_forecasts = forecasts_by_date[forecast_date]
-    
-    # Aggregate the day's forecasts
-    temps = [f["main"]["temp"] for f in day_forecasts]
-    humidities = [f["main"]["humidity"] for f in day_forecasts]
-    wind_speeds = [f["wind"]["speed"] for f in day_forecasts]
-    
-    summary = {
-        "date": forecast_date,
-        "temp_avg": round(sum(temps) / len(temps), 1),
-        "temp_max": round(max(temps), 1),
-        "temp_min": round(min(temps), 1),
-        "weather": day_forecasts[0]["weather"][0]["description"],
-        "humidity_avg": round(sum(humidities) / len(humidities), 0),
-        "wind_speed_kph": round(sum(wind_speeds) / len(wind_speeds) * 3.6, 1),
-        "conditions": [f["weather"][0]["description"] for f in day_forecasts]
-    }
 
-    with open('./datasets/weather_data.txt', "a") as file:
-        file.write(f"{summary}\n")
-    return summary
+    if not forecasts_by_date:
+        return f"No forecast data available. API Returns: {data}"
 
-@kernel_function
-async def get_adaptations():
-    with open('./datasets/adaptations.txt', "r") as file:
-        content = file.read()
-        return content
+    # Days outside the 5-day window are dropped; if none are left, use the
+    # first available date
+    days = list(dict.fromkeys(d for d in forecast_dates if d in forecasts_by_date))
+    if not days:
+        days = [next(iter(forecasts_by_date))]
+
+    summaries = []
+    for day in days:
+        summary = _summarize_day(day, forecasts_by_date[day])
+        _log_weather(summary)
+        summaries.append(summary)
+
+    return summaries if batched else summaries[0]
+
+
+# Markdown code fence around a model reply; the closing fence may be missing
+_FENCE = re.compile(r"^```(?:json)?\s*(.*?)\s*(?:```|\Z)", re.DOTALL)
+
+# Static vision prompt; only the user query is substituted per call
+_VISION_PROMPT_TMPL = """Analyze this crop/field image and answer the following question: {query}
+
+IMPORTANT: Respond ONLY with valid JSON (no markdown, no code blocks). Use this exact structure:
+
+{{
+    "observations": {{
+        "crop_type": "identified crop type or 'unknown'",
+        "growth_stage": "seedling/vegetative/flowering/fruiting/mature/harvested",
+        "visual_stress": ["list of visible stress symptoms"],
+        "pests_diseases": ["list of detected pests or diseases"],
+        "weeds_detected": true/false,
+        "irrigation_status": "description of irrigation state",
+        "soil_conditions": "description of visible soil state",
+        "anomalies": ["list of unusual features or damage"]
+    }},
+    "likely_crop": [
+        {{"name": "crop name", "confidence": 0.95}},
+        {{"name": "alternative crop", "confidence": 0.3}}
+    ],
+    "issues": [
+        {{"name": "issue name", "evidence": "visual evidence from image", "confidence": 0.85}}
+    ],
+    "recommended_next_photos": [
+        "close-up of affected leaves",
+        "underside of leaves",
+        "wider field view"
+    ],
+    "answer": "Direct answer to the user's question based on image analysis"
+}}
+
+Rules:
+- Be specific about what you see, not what you assume
+- Confidence scores: 0.0-1.0, where 1.0 is certain
+- For uncertain items, include alternative hypotheses
+- If something cannot be determined from the image, say "cannot determine"
+- Return ONLY valid JSON, no explanation or markdown
+"""
 
 
 @kernel_function
@@ -191,52 +388,16 @@ async def analyze_crop_image(image_base64: str = None, image_url: str = None, qu
             ],
             "answer": "I need an image to analyze. Please provide either a base64-encoded image or a public URL to an image."
         }
-        return json.dumps(error_response)
+        return orjson.dumps(error_response).decode()
     
     try:
-        openai_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        openai_client = get_openai_client()
         
         # Build message content with vision capabilities
         content = [
             {
                 "type": "text",
-                "text": f"""Analyze this crop/field image and answer the following question: {query}
-
-IMPORTANT: Respond ONLY with valid JSON (no markdown, no code blocks). Use this exact structure:
-
-{{
-    "observations": {{
-        "crop_type": "identified crop type or 'unknown'",
-        "growth_stage": "seedling/vegetative/flowering/fruiting/mature/harvested",
-        "visual_stress": ["list of visible stress symptoms"],
-        "pests_diseases": ["list of detected pests or diseases"],
-        "weeds_detected": true/false,
-        "irrigation_status": "description of irrigation state",
-        "soil_conditions": "description of visible soil state",
-        "anomalies": ["list of unusual features or damage"]
-    }},
-    "likely_crop": [
-        {{"name": "crop name", "confidence": 0.95}},
-        {{"name": "alternative crop", "confidence": 0.3}}
-    ],
-    "issues": [
-        {{"name": "issue name", "evidence": "visual evidence from image", "confidence": 0.85}}
-    ],
-    "recommended_next_photos": [
-        "close-up of affected leaves",
-        "underside of leaves",
-        "wider field view"
-    ],
-    "answer": "Direct answer to the user's question based on image analysis"
-}}
-
-Rules:
-- Be specific about what you see, not what you assume
-- Confidence scores: 0.0-1.0, where 1.0 is certain
-- For uncertain items, include alternative hypotheses
-- If something cannot be determined from the image, say "cannot determine"
-- Return ONLY valid JSON, no explanation or markdown
-"""
+                "text": _VISION_PROMPT_TMPL.format(query=query)
             }
         ]
         
@@ -279,31 +440,33 @@ Rules:
         response_text = response.choices[0].message.content.strip()
         
         # Remove markdown code blocks if present
-        if response_text.startswith("```"):
-            response_text = response_text.split("```")[1]
-            if response_text.startswith("json"):
-                response_text = response_text[4:]
-            response_text = response_text.split("```")[0]
-        
-        response_text = response_text.strip()
+        fenced = _FENCE.match(response_text)
+        if fenced:
+            response_text = fenced.group(1)
         
         # Parse and validate JSON
         try:
-            analysis_result = json.loads(response_text)
-        except json.JSONDecodeError:
-            # If parsing fails, return structured error
-            analysis_result = {
-                "observations": {},
-                "likely_crop": [],
-                "issues": [],
-                "recommended_next_photos": [
-                    "Unable to analyze image clearly",
-                    "Please provide a clearer photo with better lighting"
-                ],
-                "answer": f"I encountered an error analyzing the image. Raw response: {response_text[:200]}"
-            }
-        
-        return json.dumps(analysis_result)
+            analysis_result = orjson.loads(response_text)
+        except orjson.JSONDecodeError:
+            analysis_result = None
+
+        if isinstance(analysis_result, dict):
+            # Already a valid JSON object: return the text as-is rather
+            # than serializing the parsed value again
+            return response_text
+
+        # If parsing fails, return structured error
+        analysis_result = {
+            "observations": {},
+            "likely_crop": [],
+            "issues": [],
+            "recommended_next_photos": [
+                "Unable to analyze image clearly",
+                "Please provide a clearer photo with better lighting"
+            ],
+            "answer": f"I encountered an error analyzing the image. Raw response: {response_text[:200]}"
+        }
+        return orjson.dumps(analysis_result).decode()
         
     except Exception as e:
         # Handle API errors gracefully
@@ -317,4 +480,4 @@ Rules:
             ],
             "answer": f"Sorry, I encountered an error analyzing the image: {str(e)}"
         }
-        return json.dumps(error_response)
\ No newline at end of file
+        return orjson.dumps(error_response).decode()
\ No newline at end of file
@@ -6,26 +6,158 @@ through language detection, weather data retrieval, and AI-powered recommendatio
 """
 
 import asyncio
+import datetime
+import hashlib
 import json
 import os
-from typing import Optional, Dict, Any
+import re
+import sys
+from contextlib import aclosing
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Union
 
-import pandas as pd
+import orjson
 from dotenv import load_dotenv
 from semantic_kernel.functions.kernel_arguments import KernelArguments
-from semantic_kernel.contents.chat_history import ChatHistory
 from semantic_kernel.contents import AuthorRole, ChatMessageContent
 from semantic_kernel.exceptions.service_exceptions import ServiceResponseException
 from semantic_kernel.exceptions.function_exceptions import FunctionExecutionException
 
+from kernel_functions import close_resources
 from src.config import KernelConfig, CostCalculator
 from src.agent_manager import AgentManager
+from src.agents import ParseAgent
 from src.utils.language_detection import detect_user_language
 from src.utils.logging_handler import DataLogger, TokenTracker
+from src.utils.cache import LRUCache
+from src.utils.fast_parse import fast_parse
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 # Load environment variables
 load_dotenv()
 
+# Full tracebacks for handled errors are printed only when KHETSETU_DEBUG=1
+_DEBUG = os.getenv("KHETSETU_DEBUG") == "1"
+if _DEBUG:
+    import traceback
+
+# Pre-bound stdout writers for the agent transcript loop
+_write = sys.stdout.write
+_flush = sys.stdout.flush
+
+# Re-prompts allowed when the parsed input is missing a required field
+MAX_RETRIES = 3
+
+# Intents that use weather data (the CLI serves only these; the web API also
+# takes the image intents)
+_VALID_INTENTS = frozenset({"get_solution", "weather_forecast", "weather_history"})
+
+# Prompts used when the parsed input is missing a required field
+_FIELD_PROMPTS = {
+    'intent': "KhetSetu answers agriculture-related questions. Try asking about farming, weather forecasts, or past climate trends: ",
+    'location': 'Please enter a location (e.g., city, state, or country): '
+}
+
+
+def _extract_usage(message) -> tuple:
+    """Return (prompt_tokens, completion_tokens) from a message's usage metadata, defaulting to 0."""
+    metadata = getattr(message, 'metadata', None)
+    usage = metadata.get('usage') if metadata else None
+    if not usage:
+        return 0, 0
+    return getattr(usage, 'prompt_tokens', 0), getattr(usage, 'completion_tokens', 0)
+
+
+_PUNCTUATION = re.compile(r"[^\w\s]+")
+
+
+def _normalize_query(text: str) -> str:
+    """Lowercase text and drop punctuation and repeated whitespace, for cache keys."""
+    return " ".join(_PUNCTUATION.sub(" ", text.lower()).split())
+
+
+def _head_tail(text: str, head: int = 2000, tail: int = 1000) -> str:
+    """
+    Bound a tool output for the agent context by eliding its middle.
+    
+    Args:
+        text: Text to truncate
+        head: Number of leading characters to keep
+        tail: Number of trailing characters to keep
+        
+    Returns:
+        The text unchanged if short enough, otherwise its head and tail
+    """
+    if len(text) <= head + tail + 32:
+        return text
+    return f"{text[:head]}\n...[{len(text) - head - tail} chars elided]...\n{text[-tail:]}"
+
+
+def _percent(confidence) -> str:
+    """Format a 0-1 confidence score as a whole percentage."""
+    try:
+        return f"{float(confidence):.0%}"
+    except (TypeError, ValueError):
+        return "?"
+
+
+def _vision_brief(analysis_json: str) -> str:
+    """
+    Condense the analyze_crop_image JSON into a short plain-text brief for VisionCropAgent.
+    
+    Args:
+        analysis_json: JSON string returned by analyze_crop_image
+        
+    Returns:
+        One line per non-empty field, or the input unchanged if it is not
+        valid analysis JSON
+    """
+    try:
+        analysis = orjson.loads(analysis_json)
+    except orjson.JSONDecodeError:
+        return analysis_json
+    if not isinstance(analysis, dict):
+        return analysis_json
+
+    observations = analysis.get("observations") or {}
+    lines = []
+    crops = [
+        f"{crop.get('name', 'unknown')} ({_percent(crop.get('confidence'))})"
+        for crop in analysis.get("likely_crop") or [] if isinstance(crop, dict)
+    ]
+    if crops:
+        lines.append("Likely crop: " + ", ".join(crops))
+    for key, label in (
+        ("crop_type", "Crop type"),
+        ("growth_stage", "Growth stage"),
+        ("visual_stress", "Visual stress"),
+        ("pests_diseases", "Pests/diseases"),
+        ("weeds_detected", "Weeds detected"),
+        ("irrigation_status", "Irrigation"),
+        ("soil_conditions", "Soil"),
+        ("anomalies", "Anomalies"),
+    ):
+        value = observations.get(key)
+        if isinstance(value, bool):
+            value = "yes" if value else "no"
+        elif isinstance(value, list):
+            value = "; ".join(map(str, value))
+        if value:
+            lines.append(f"{label}: {value}")
+    for issue in analysis.get("issues") or []:
+        if isinstance(issue, dict):
+            lines.append(
+                f"Issue: {issue.get('name', 'unknown')} ({_percent(issue.get('confidence'))})"
+                f" - evidence: {issue.get('evidence', 'none given')}"
+            )
+    photos = analysis.get("recommended_next_photos")
+    if photos:
+        lines.append("Suggested next photos: " + "; ".join(map(str, photos)))
+    if analysis.get("answer"):
+        lines.append(f"Preliminary answer: {analysis['answer']}")
+    return "\n".join(lines)
+
 
 class KhetSetu:
     """
@@ -35,17 +167,41 @@ class KhetSetu:
     query processing.
     """
 
+    # Shared by every instance in the process (the API keeps a pool of them)
+    _parse_cache = LRUCache(256)  # blake2b(normalized input) -> parsed dict
+    _weather_cache = LRUCache(256)  # (location, years, date, day) -> summaries
+
     def __init__(self):
         """Initialize KhetSetu system."""
         self.kernel = KernelConfig.create_kernel()
         self.agent_group_chat = AgentManager.create_agent_group_chat(self.kernel)
+        # Reuse the chat's ParseAgent for every parse
+        self.parse_agent = next(
+            (agent for agent in self.agent_group_chat.agents if agent.name == ParseAgent.NAME),
+            None
+        ) or ParseAgent.create(self.kernel)
         self.data_logger = DataLogger()
         self.token_tracker = TokenTracker()
         self.cost_calculator = CostCalculator()
         self.agent_outputs = []  # Store agent outputs for web API
+        self._history_args = KernelArguments()  # Reused by get_weather_context
+        self._forecast_args = KernelArguments()
         self.current_image_base64 = None  # Store current image for vision analysis
         self.current_image_url = None  # Store current image URL for vision analysis
 
+    async def detect_language(self, user_input: str) -> tuple:
+        """
+        Detect the user's language (repeated inputs hit detect_user_language's cache).
+        
+        Args:
+            user_input: Raw user input text
+            
+        Returns:
+            Tuple of (language_code, language_name)
+        """
+        # Detection is CPU work, so keep it off the event loop
+        return await asyncio.to_thread(detect_user_language, user_input)
+
     async def parse_user_input(
         self,
         parse_agent,
@@ -61,71 +217,86 @@ class KhetSetu:
         Returns:
             Dictionary with parsed intent, location, and date info, or None on error
         """
-        responses = []
+        # Plain forecast requests ("weather in Pune tomorrow") need no LLM call
+        parsed = fast_parse(user_input)
+        if parsed is not None:
+            return parsed
+
+        # Inputs differing only in case, punctuation or spacing share an entry
+        key = hashlib.blake2b(
+            _normalize_query(user_input).encode(), digest_size=16
+        ).digest()
+        cached = self._parse_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        first = None
         try:
             async for response in parse_agent.invoke(messages=user_input):
-                responses.append(response)
-                if hasattr(response, "metadata"):
-                    usage = response.metadata.get("usage")
-                    if usage:
-                        self.token_tracker.update_agent_tokens(
-                            "ParseAgent",
-                            usage.prompt_tokens if hasattr(usage, 'prompt_tokens') else 0,
-                            usage.completion_tokens if hasattr(usage, 'completion_tokens') else 0
-                        )
+                # Only the first response is parsed; later ones are just metered
+                if first is None:
+                    first = response
+                prompt_tokens, completion_tokens = _extract_usage(response)
+                if prompt_tokens or completion_tokens:
+                    self.token_tracker.update_agent_tokens(
+                        "ParseAgent", prompt_tokens, completion_tokens
+                    )
         except json.JSONDecodeError as e:
             print("Error: Failed to parse response. Please restart and try again.")
             return None
 
-        if not responses:
+        if first is None:
             return None
 
         try:
-            parsed = json.loads(responses[0].content.content)
+            parsed = orjson.loads(first.content.content)
+            # The ParseResult schema guarantees a known intent, so any
+            # decoded object is safe to cache
+            if isinstance(parsed, dict):
+                self._parse_cache.set(key, dict(parsed))
             return parsed
-        except (json.JSONDecodeError, KeyError, AttributeError):
+        except (ValueError, TypeError, KeyError, AttributeError):
             print("Error: Failed to parse JSON response.")
             return None
 
-    async def request_missing_value(
+    async def request_missing_values(
         self,
-        field_name: str,
-        parse_agent,
-        validation_fn=None
-    ) -> Optional[str]:
+        field_names: list,
+        parse_agent
+    ) -> Optional[Dict[str, Any]]:
         """
-        Request a missing or invalid value from the user.
+        Request one or more missing or invalid values from the user in a single prompt.
         
         Args:
-            field_name: Name of the field being requested
+            field_names: Names of the fields being requested
             parse_agent: The ParseAgent instance
-            validation_fn: Optional function to validate the response
             
         Returns:
-            User's input or None if invalid
+            Parsed data for the user's reply, or None if it could not be parsed
         """
-        prompts = {
-            'intent': "KhetSetu answers agriculture-related questions. Try asking about farming, weather forecasts, or past climate trends: ",
-            'location': 'Please enter a location (e.g., city, state, or country): '
-        }
+        prompt = "\n".join(
+            _FIELD_PROMPTS.get(field_name, f"Please provide {field_name}").rstrip(": ")
+            for field_name in field_names
+        ) + ": "
 
-        user_message = input(prompts.get(field_name, f"Please provide {field_name}: "))
+        # Read in a worker thread so the event loop keeps running
+        user_message = await asyncio.to_thread(input, prompt)
 
         await self.agent_group_chat.add_chat_message(ChatMessageContent(
             role=AuthorRole.USER,
             content=user_message
         ))
 
-        parsed = await self.parse_user_input(parse_agent, user_message)
-
-        if parsed is None:
-            return None
+        return await self.parse_user_input(parse_agent, user_message)
 
-        if validation_fn:
-            return validation_fn(parsed)
-        return parsed.get(field_name)
-
-    async def get_weather_context(self, location: str, start_year: int, end_year: int, forecast_date: int) -> tuple:
+    async def get_weather_context(
+        self,
+        location: str,
+        start_year: int,
+        end_year: int,
+        forecast_date: Union[int, str, List[int]],
+        user_intent: Optional[str] = None
+    ) -> tuple:
         """
         Retrieve weather history and forecast data.
         
@@ -133,39 +304,72 @@ class KhetSetu:
             location: Location for weather data
             start_year: Start year for historical data
             end_year: End year for historical data
-            forecast_date: Forecast date parameter
+            forecast_date: Days from today, a "YYYY-MM-DD" date, or a list of
+                days for a multi-day forecast
+            user_intent: Parsed user intent; weather_forecast and weather_history
+                only fetch the data they need, anything else fetches both
             
         Returns:
-            Tuple of (historical_summary, forecast_summary)
+            Tuple of (historical_summary, forecast_summary); a summary that was
+            not fetched is an empty string
         """
-        history_args = KernelArguments(
-            location=location,
-            start_year=start_year,
-            end_year=end_year
-        )
-
-        forecast_args = KernelArguments(
-            location=location,
-            forecast_date=forecast_date
+        want_history = user_intent != "weather_forecast"
+        want_forecast = user_intent != "weather_history"
+
+        # Today's date is part of the key so forecasts never outlive the day
+        if isinstance(forecast_date, list):
+            forecast_date = tuple(forecast_date)
+        key = (
+            str(location).strip().lower(), start_year, end_year, forecast_date,
+            want_history, want_forecast, datetime.date.today()
         )
-
-        try:
-            historical_summary = await self.kernel.invoke(
+        cached = self._weather_cache.get(key)
+        if cached is not None:
+            return cached
+
+        lookups = []
+        if want_history:
+            # Reuse this instance's argument objects, updating them in place
+            history_args = self._history_args
+            history_args["location"] = location
+            history_args["start_year"] = start_year
+            history_args["end_year"] = end_year
+            lookups.append(self.kernel.invoke(
                 plugin_name="climate_tools",
                 function_name="get_NASA_data",
                 arguments=history_args
-            )
-
-            forecast_summary = await self.kernel.invoke(
+            ))
+        if want_forecast:
+            forecast_args = self._forecast_args
+            forecast_args["location"] = location
+            forecast_args["forecast_date"] = forecast_date
+            lookups.append(self.kernel.invoke(
                 plugin_name="climate_tools",
                 function_name="get_forecast",
                 arguments=forecast_args
-            )
+            ))
 
-            return historical_summary, forecast_summary
-        except Exception as e:
-            print(f"Warning: Could not retrieve weather data: {e}")
-            return "", ""
+        # Run the lookups concurrently; they share one geocoding request.
+        # A failure in one keeps the other's result.
+        results = await asyncio.gather(*lookups, return_exceptions=True)
+
+        summaries = []
+        for result in results:
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, Exception):
+                print(f"Warning: Could not retrieve weather data: {result}")
+                summaries.append("")
+            else:
+                summaries.append(result)
+
+        # Partial results are not cached so a failed lookup is retried
+        cacheable = all(summaries)
+        historical_summary = summaries.pop(0) if want_history else ""
+        forecast_summary = summaries.pop(0) if want_forecast else ""
+        if cacheable:
+            self._weather_cache.set(key, (historical_summary, forecast_summary))
+        return historical_summary, forecast_summary
 
     async def run_agent_group_chat(
         self,
@@ -174,7 +378,7 @@ class KhetSetu:
         user_language: str,
         context: str,
         input_id: int
-    ) -> pd.DataFrame:
+    ) -> "pd.DataFrame":
         """
         Run the agent group chat conversation.
         
@@ -188,64 +392,97 @@ class KhetSetu:
         Returns:
             DataFrame with conversation outputs
         """
-        output_df = pd.DataFrame(columns=['InputID', 'SequenceNumber', 'AgentName', 'Output'])
+        records = []
         sequence_number = 1
+        AgentManager.set_intent(self.agent_group_chat, user_intent)
+
+        # Logging, token tracking and printing run in a consumer task so the
+        # agent loop only hands each message over and moves on
+        queue = asyncio.Queue(maxsize=8)
+        logger_task = asyncio.create_task(self._log_consumer(queue, records, input_id))
 
         try:
-            async for content in self.agent_group_chat.invoke():
-                output_df = self.data_logger.add_output_record(
-                    output_df,
-                    input_id,
-                    sequence_number,
-                    content.name,
-                    content.content
+            try:
+                async for content in self.agent_group_chat.invoke():
+                    await queue.put(content)
+
+                    # Check if conversation is complete
+                    if ("This conversation is complete." in content.content and 
+                        content.name == "PromptAgent"):
+                        self.agent_group_chat.is_complete = True
+                        break
+            finally:
+                # Let the consumer finish everything already queued. If it dies
+                # first, a put on the full queue would never return, so stop
+                # waiting on the put once the consumer is done.
+                if not logger_task.done():
+                    stop = asyncio.ensure_future(queue.put(None))
+                    await asyncio.wait({stop, logger_task}, return_when=asyncio.FIRST_COMPLETED)
+                    stop.cancel()
+                # Re-raises the consumer's exception, if any
+                sequence_number = await logger_task
+
+        except (ServiceResponseException, FunctionExecutionException, json.JSONDecodeError) as e:
+            # Error records are appended to the records list like agent outputs
+            if isinstance(e, ServiceResponseException):
+                if "tokens_limit_reached" in str(e):
+                    print("Conversation ended: Token limit reached")
+                    self.data_logger.add_output_record(
+                        records, input_id, sequence_number, "System",
+                        "Conversation ended due to token limit."
+                    )
+            elif isinstance(e, FunctionExecutionException):
+                print("Error: Rate limit exceeded. Please wait 24 hours before retrying.")
+                self.data_logger.add_output_record(
+                    records, input_id, sequence_number, "System",
+                    "Rate limit exceeded."
                 )
-                sequence_number += 1
-
-                # Track tokens
-                if hasattr(content, 'metadata'):
-                    usage = content.metadata.get("usage")
-                    if usage:
-                        self.token_tracker.update_agent_tokens(
-                            content.name,
-                            usage.prompt_tokens if hasattr(usage, 'prompt_tokens') else 0,
-                            usage.completion_tokens if hasattr(usage, 'completion_tokens') else 0
-                        )
-
-                # Reduce history if too many tokens
-                summary = self.token_tracker.get_summary()
-                if summary['total_tokens'] > 7000:
-                    await self.agent_group_chat.reduce_history()
-
-                print(f"==={content.name or '*'}===: '{content.content}\n'")
-
-                # Check if conversation is complete
-                if ("This conversation is complete." in content.content and 
-                    content.name == "PromptAgent"):
-                    self.agent_group_chat.is_complete = True
-                    break
-
-        except ServiceResponseException as e:
-            if "tokens_limit_reached" in str(e):
-                print("Conversation ended: Token limit reached")
-                output_df = self.data_logger.add_output_record(
-                    output_df, input_id, sequence_number, "System",
-                    "Conversation ended due to token limit."
+            else:
+                print("Error: Failed to parse response. Please restart and try again.")
+                self.data_logger.add_output_record(
+                    records, input_id, sequence_number, "System",
+                    "JSON parsing error."
                 )
-        except FunctionExecutionException as e:
-            print("Error: Rate limit exceeded. Please wait 24 hours before retrying.")
-            output_df = self.data_logger.add_output_record(
-                output_df, input_id, sequence_number, "System",
-                "Rate limit exceeded."
-            )
-        except json.JSONDecodeError as e:
-            print("Error: Failed to parse response. Please restart and try again.")
-            output_df = self.data_logger.add_output_record(
-                output_df, input_id, sequence_number, "System",
-                "JSON parsing error."
+
+        return self.data_logger.build_output_df(records)
+
+    async def _log_consumer(self, queue: asyncio.Queue, records: list, input_id: int) -> int:
+        """
+        Record, meter and print agent messages from the queue until None arrives.
+        
+        Args:
+            queue: Queue of ChatMessageContent items, ending with None
+            records: Output records list to append to
+            input_id: Unique input identifier
+            
+        Returns:
+            The next unused sequence number
+        """
+        sequence_number = 1
+        while (content := await queue.get()) is not None:
+            self.data_logger.add_output_record(
+                records,
+                input_id,
+                sequence_number,
+                content.name,
+                content.content
             )
+            sequence_number += 1
 
-        return output_df
+            # Track tokens
+            prompt_tokens, completion_tokens = _extract_usage(content)
+            if prompt_tokens or completion_tokens:
+                self.token_tracker.update_agent_tokens(
+                    content.name, prompt_tokens, completion_tokens
+                )
+
+            _write("===")
+            _write(content.name or '*')
+            _write("===: '")
+            _write(content.content)
+            _write("\n'\n")
+            _flush()
+        return sequence_number
 
     async def main(self) -> None:
         """Main execution function for KhetSetu."""
@@ -253,33 +490,28 @@ class KhetSetu:
         input_id = self.data_logger.get_next_input_id()
 
         # Get user input
-        user_input = input("User Prompt: ")
+        user_input = await asyncio.to_thread(input, "User Prompt: ")
         self.data_logger.log_input(input_id, user_input)
 
-        # Detect user language
-        detected_code, user_language = detect_user_language(user_input)
+        # Detect user language in a worker thread while the input is parsed
+        lang_task = asyncio.create_task(self.detect_language(user_input))
+
+        # Parse user input
+        parse_task = asyncio.create_task(self.parse_user_input(self.parse_agent, user_input))
+
+        detected_code, user_language = await lang_task
         language_context = (
             f"The user's language is {user_language}. "
             f"Please respond appropriately in that language."
         )
 
-        # Add context messages
-        await self.agent_group_chat.add_chat_message(ChatMessageContent(
-            role=AuthorRole.USER,
-            content=language_context
-        ))
+        # Add context messages in one call
+        await self.agent_group_chat.add_chat_messages([
+            ChatMessageContent(role=AuthorRole.USER, content=language_context),
+            ChatMessageContent(role=AuthorRole.USER, content=user_input)
+        ])
 
-        await self.agent_group_chat.add_chat_message(ChatMessageContent(
-            role=AuthorRole.USER,
-            content=user_input
-        ))
-
-        # Create parse agent for extraction
-        from src.agents import ParseAgent
-        parse_agent = ParseAgent.create(self.kernel)
-
-        # Parse user input
-        parsed = await self.parse_user_input(parse_agent, user_input)
+        parsed = await parse_task
 
         if parsed is None:
             print("Error: Could not parse user input.")
@@ -291,36 +523,50 @@ class KhetSetu:
         end_year = parsed.get("end_year", 2025)
         forecast_date = parsed.get("forecast_date", 0)
 
-        # Request missing values
-        while user_intent not in ["get_solution", "weather_forecast", "weather_history"]:
-            user_intent = await self.request_missing_value(
-                'intent',
-                parse_agent,
-                lambda p: p.get("user_intent")
-            )
-            if user_intent:
+        # Request missing values, asking for all of them at once. The ParseAgent
+        # schema only allows known intents, so the intent check here only
+        # catches the image intents, which the CLI cannot serve (no image input)
+        for _ in range(MAX_RETRIES):
+            missing = []
+            if user_intent not in _VALID_INTENTS:
+                missing.append('intent')
+            if not location:
+                missing.append('location')
+            if not missing:
+                break
+
+            retry = await self.request_missing_values(missing, self.parse_agent)
+            if retry is None:
+                continue
+
+            new_intent = retry.get("user_intent")
+            if 'intent' in missing and new_intent:
+                user_intent = new_intent
                 print(f"Updated user intent: {user_intent}")
-
-        while not location:
-            location = await self.request_missing_value(
-                'location',
-                parse_agent,
-                lambda p: p.get("location")
-            )
-            if location:
+            new_location = retry.get("location")
+            if 'location' in missing and new_location:
+                location = new_location
                 print(f"Updated location: {location}")
 
+        if user_intent not in _VALID_INTENTS or not location:
+            print("Error: Could not determine the request intent and location. Please restart and try again.")
+            return
+
         # Get weather data
         historical_summary, forecast_summary = await self.get_weather_context(
-            location, start_year, end_year, forecast_date
+            location, start_year, end_year, forecast_date, user_intent
         )
 
-        # Build context for agents
-        context = (
-            f"The location is {location}. The user intent is {user_intent}. "
-            f"The user's question is {user_input}. The user's language is {user_language}. "
-            f"The weather forecast is {forecast_summary} and the weather history is {historical_summary}"
-        )
+        # Build context for agents; stringify each weather result once and
+        # join all pieces in a single allocation
+        context = "".join([
+            "The location is ", location,
+            ". The user intent is ", user_intent,
+            ". The user's question is in the message above",
+            ". The user's language is ", user_language,
+            ". The weather forecast is ", _head_tail(str(forecast_summary)),
+            " and the weather history is ", _head_tail(str(historical_summary))
+        ])
 
         await self.agent_group_chat.add_chat_message(ChatMessageContent(
             role=AuthorRole.USER,
@@ -338,24 +584,9 @@ class KhetSetu:
 
         # Calculate and log costs
         summary = self.token_tracker.get_summary()
-        total_cost = self.cost_calculator.calculate_cost(
-            summary['total_prompt_tokens'],
-            summary['total_completion_tokens']
-        )
+        total_cost = self.cost_calculator.summary_cost(summary)
 
-        self.data_logger.log_token_usage(
-            input_id,
-            summary['prompt_agent_tokens'],
-            summary['parse_tokens'],
-            summary['forecast_tokens'],
-            summary['history_tokens'],
-            summary['solution_tokens'],
-            summary['reviewer_tokens'],
-            summary['total_tokens'],
-            summary['total_prompt_tokens'],
-            summary['total_completion_tokens'],
-            total_cost
-        )
+        self.data_logger.log_token_usage(input_id, summary, total_cost)
 
         # Print cost summary
         print(f"\n{'='*50}")
@@ -384,67 +615,158 @@ class KhetSetu:
         Returns:
             Dictionary with agent outputs, final answer, and token summary
         """
+        result = None
+        async for event in self.stream_web_query(
+            user_input,
+            image_base64=image_base64,
+            image_url=image_url
+        ):
+            if event["event"] == "result":
+                result = event["data"]
+        return result
+
+    async def analyze_image(
+        self,
+        user_input: str,
+        image_base64: Optional[str] = None,
+        image_url: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Run the crop image analysis kernel function.
+        
+        Args:
+            user_input: The user's question about the image
+            image_base64: Optional base64-encoded image data (without data: prefix)
+            image_url: Optional URL to a public image
+            
+        Returns:
+            Vision analysis JSON string, or None if the analysis failed
+        """
+        try:
+            vision_args = KernelArguments(
+                image_base64=image_base64 or "",
+                image_url=image_url or "",
+                query=user_input
+            )
+            vision_result = await self.kernel.invoke(
+                plugin_name="vision_tools",
+                function_name="analyze_crop_image",
+                arguments=vision_args
+            )
+            return vision_result.value if hasattr(vision_result, "value") else str(vision_result)
+        except Exception as vision_error:
+            print(f"Warning: Vision analysis failed: {vision_error}")
+            if _DEBUG:
+                traceback.print_exc()
+            return None
+
+    async def _agent_turns(self, stream_tokens: bool = False):
+        """
+        Run the agent group chat, yielding its turns.
+        
+        Args:
+            stream_tokens: Stream each agent's reply as it is generated
+            
+        Yields:
+            ("delta", agent_name, text) for each generated text chunk when
+            stream_tokens is set, and ("turn", agent_name, output, prompt_tokens,
+            completion_tokens) once each agent turn is complete
+        """
+        # The chat holds its activity flag until its invoke generator finishes,
+        # so close it explicitly when the caller stops early
+        if not stream_tokens:
+            async with aclosing(self.agent_group_chat.invoke()) as responses:
+                async for response in responses:
+                    output = getattr(response, 'content', None)
+                    if output is None:
+                        output = str(response)
+                    yield ("turn", getattr(response, 'name', "Unknown"), output,
+                           *_extract_usage(response))
+            return
+
+        # The group chat stream only yields text chunks (its usage-only chunks
+        # are dropped), so a turn ends when the next agent starts speaking
+        agent_name = None
+        parts = []
+        async with aclosing(self.agent_group_chat.invoke_stream()) as chunks:
+            async for chunk in chunks:
+                chunk_name = chunk.name or "Unknown"
+                if agent_name is not None and chunk_name != agent_name:
+                    yield ("turn", agent_name, "".join(parts), 0, 0)
+                    parts = []
+                agent_name = chunk_name
+                parts.append(chunk.content)
+                yield ("delta", agent_name, chunk.content)
+        if agent_name is not None:
+            yield ("turn", agent_name, "".join(parts), 0, 0)
+
+    async def stream_web_query(
+        self,
+        user_input: str,
+        image_base64: Optional[str] = None,
+        image_url: Optional[str] = None,
+        stream_tokens: bool = False
+    ):
+        """
+        Process a user query, yielding each agent response as soon as it is ready.
+        
+        Args:
+            user_input: The user's agricultural query
+            image_base64: Optional base64-encoded image data (without data: prefix)
+            image_url: Optional URL to a public image
+            stream_tokens: Also stream agent replies as they are generated.
+                Token usage is not reported for streamed turns.
+            
+        Yields:
+            {"event": "delta", "data": {"name": ..., "text": ...}} for each
+            generated text chunk when stream_tokens is set,
+            {"event": "agent", "data": <agent output>} for every agent turn, then
+            {"event": "result", "data": <full response dict>} as the last event
+        """
+        # A new list, not clear(): earlier results still reference the old one
         self.agent_outputs = []
-        self.token_tracker = TokenTracker()  # Reset token tracker
+        self.token_tracker.reset()
+
+        # Instances are reused across web requests, so start from a clean chat
+        await self.agent_group_chat.reset()
+        self.agent_group_chat.is_complete = False
+
+        # Start vision analysis right away so it overlaps with language
+        # detection, parsing and the weather lookups
+        vision_task = None
+        if image_base64 or image_url:
+            vision_task = asyncio.create_task(
+                self.analyze_image(user_input, image_base64, image_url)
+            )
         
         try:
-            # Detect language - returns tuple (code, language_name)
-            detected_code, user_language = detect_user_language(user_input)
+            # Detect language (worker thread) and parse the input concurrently;
+            # language detection returns tuple (code, language_name)
+            (detected_code, user_language), parsed_data = await asyncio.gather(
+                self.detect_language(user_input),
+                self.parse_user_input(self.parse_agent, user_input)
+            )
             
-            # Add language context
+            # Language context, added to the chat together with the agent context
             language_context = (
                 f"The user's language is {user_language}. "
                 f"Please respond appropriately in that language."
             )
             
-            await self.agent_group_chat.add_chat_message(ChatMessageContent(
-                role=AuthorRole.USER,
-                content=language_context
-            ))
-            
-            await self.agent_group_chat.add_chat_message(ChatMessageContent(
-                role=AuthorRole.USER,
-                content=user_input
-            ))
-            
-            # Add image information if provided
-            image_context = ""
             # Note: Image data will be passed in context, not as separate message
-            
-            # Get parse agent
-            from src.agents import ParseAgent
-            parse_agent = ParseAgent.create(self.kernel)
-            
-            # Pre-analyze image if provided (run vision analysis before agent group chat)
-            vision_analysis_json = None
-            if image_base64 or image_url:
-                try:
-                    vision_args = KernelArguments(
-                        image_base64=image_base64 or "",
-                        image_url=image_url or "",
-                        query=user_input
-                    )
-                    vision_result = await self.kernel.invoke(
-                        plugin_name="vision_tools",
-                        function_name="analyze_crop_image",
-                        arguments=vision_args
-                    )
-                    vision_analysis_json = vision_result.value if hasattr(vision_result, "value") else str(vision_result)
-                except Exception as vision_error:
-                    print(f"Warning: Vision analysis failed: {vision_error}")
-                    import traceback
-                    traceback.print_exc()
-            
-            # Parse user input
-            parsed_data = await self.parse_user_input(parse_agent, user_input)
+            if parsed_data:
+                user_intent = parsed_data.get("user_intent", "weather_forecast")
+                has_image = parsed_data.get("has_image", False) or bool(image_base64 or image_url)
+                if has_image and user_intent not in ["diagnose_from_image", "image_qna"]:
+                    user_intent = "diagnose_from_image"
+
+            # parsed_data always carries a known intent (fast_parse, the parse
+            # cache and the ParseAgent schema), so only a failed parse stops here
             if not parsed_data:
                 # Return partial results if we have any agent outputs
                 summary = self.token_tracker.get_summary()
-                total_cost = self.cost_calculator.calculate_cost(
-                    summary['total_prompt_tokens'],
-                    summary['total_completion_tokens']
-                )
-                return {
+                total_cost = self.cost_calculator.summary_cost(summary)
+                yield {"event": "result", "data": {
                     "status": "error",
                     "message": "Failed to parse input",
                     "agents": self.agent_outputs,
@@ -454,14 +776,10 @@ class KhetSetu:
                         "total_completion_tokens": summary['total_completion_tokens'],
                         "total_cost_usd": round(total_cost, 6)
                     }
-                }
+                }}
+                return
             
-            user_intent = parsed_data.get("user_intent", "weather_forecast")
-            has_image = parsed_data.get("has_image", False) or bool(image_base64 or image_url)
             location = parsed_data.get("location", "Unknown")
-
-            if has_image and user_intent not in ["diagnose_from_image", "image_qna"]:
-                user_intent = "diagnose_from_image"
             start_year = parsed_data.get("start_year", 2015)
             end_year = parsed_data.get("end_year", 2025)
             forecast_date = parsed_data.get("forecast_date", 0)
@@ -469,91 +787,82 @@ class KhetSetu:
             # Get weather data (only for weather-related intents)
             historical_summary = ""
             forecast_summary = ""
-            if user_intent in ["weather_forecast", "weather_history", "get_solution"]:
+            if user_intent in _VALID_INTENTS:
                 historical_summary, forecast_summary = await self.get_weather_context(
-                    location, start_year, end_year, forecast_date
+                    location, start_year, end_year, forecast_date, user_intent
                 )
 
             # Build context with image handling
             context_parts = [
                 f"The user intent is {user_intent}.",
-                f"The user's question is {user_input}.",
+                "The user's question is in the message above.",
                 f"The user's language is {user_language}."
             ]
 
-            # Include vision analysis results if we pre-analyzed an image
+            # Include a brief of the vision analysis if we pre-analyzed an image
+            vision_analysis_json = await vision_task if vision_task else None
             if vision_analysis_json:
-                context_parts.append("\n=== VISION ANALYSIS RESULTS (JSON) ===")
-                context_parts.append(vision_analysis_json)
+                context_parts.append("\n=== VISION ANALYSIS ===")
+                context_parts.append(_vision_brief(vision_analysis_json))
                 context_parts.append("=== END VISION ANALYSIS ===\n")
 
             if location and location != "Unknown":
                 context_parts.append(f"The location is {location}.")
 
             if forecast_summary:
-                context_parts.append(f"Weather forecast: {forecast_summary}")
+                context_parts.append(f"Weather forecast: {_head_tail(str(forecast_summary))}")
             if historical_summary:
-                context_parts.append(f"Weather history: {historical_summary}")
+                context_parts.append(f"Weather history: {_head_tail(str(historical_summary))}")
 
             context = " ".join(context_parts)
             
-            await self.agent_group_chat.add_chat_message(ChatMessageContent(
-                role=AuthorRole.USER,
-                content=context
-            ))
+            # Add the language, question and context messages in one call
+            await self.agent_group_chat.add_chat_messages([
+                ChatMessageContent(role=AuthorRole.USER, content=language_context),
+                ChatMessageContent(role=AuthorRole.USER, content=user_input),
+                ChatMessageContent(role=AuthorRole.USER, content=context)
+            ])
             
             # Run agent group chat and capture outputs
+            AgentManager.set_intent(self.agent_group_chat, user_intent)
             final_answer = None
             try:
-                async for response in self.agent_group_chat.invoke():
-                    agent_name = response.name if hasattr(response, 'name') else "Unknown"
-                    output = response.content if hasattr(response, 'content') else str(response)
+                async with aclosing(self._agent_turns(stream_tokens)) as turns:
+                    async for turn in turns:
+                        if turn[0] == "delta":
+                            yield {"event": "delta", "data": {"name": turn[1], "text": turn[2]}}
+                            continue
+                        _, agent_name, output, prompt_tokens, completion_tokens = turn
                     
-                    # Track tokens if available
-                    if hasattr(response, "metadata"):
-                        usage = response.metadata.get("usage")
-                        if usage:
-                            prompt_tokens = usage.prompt_tokens if hasattr(usage, 'prompt_tokens') else 0
-                            completion_tokens = usage.completion_tokens if hasattr(usage, 'completion_tokens') else 0
+                        # Track tokens if available
+                        if prompt_tokens or completion_tokens:
                             self.token_tracker.update_agent_tokens(agent_name, prompt_tokens, completion_tokens)
-                            
-                            self.agent_outputs.append({
-                                "name": agent_name,
-                                "status": "complete",
-                                "output": output,
-                                "tokens": {
-                                    "prompt_tokens": prompt_tokens,
-                                    "completion_tokens": completion_tokens
-                                }
-                            })
-                        else:
-                            self.agent_outputs.append({
-                                "name": agent_name,
-                                "status": "complete",
-                                "output": output,
-                                "tokens": {"prompt_tokens": 0, "completion_tokens": 0}
-                            })
-                    else:
-                        self.agent_outputs.append({
+
+                        agent_output = {
                             "name": agent_name,
                             "status": "complete",
                             "output": output,
-                            "tokens": {"prompt_tokens": 0, "completion_tokens": 0}
-                        })
+                            "tokens": {
+                                "prompt_tokens": prompt_tokens,
+                                "completion_tokens": completion_tokens
+                            }
+                        }
+                        self.agent_outputs.append(agent_output)
+                        yield {"event": "agent", "data": agent_output}
                     
-                    # Capture the final answer (last PromptAgent output)
-                    if agent_name == "PromptAgent":
-                        final_answer = output
+                        # Capture the final answer (last PromptAgent output)
+                        if agent_name == "PromptAgent":
+                            final_answer = output
                     
-                    # Check for completion signal
-                    if "This conversation is complete." in output and agent_name == "PromptAgent":
-                        break
+                        # Check for completion signal
+                        if "This conversation is complete." in output and agent_name == "PromptAgent":
+                            break
                         
             except Exception as invoke_error:
                 # Log but continue to return partial results
                 print(f"Error during agent invocation: {invoke_error}")
-                import traceback
-                traceback.print_exc()
+                if _DEBUG:
+                    traceback.print_exc()
             
             # Extract final answer from the last PromptAgent response
             # Remove the completion marker if present
@@ -572,12 +881,9 @@ class KhetSetu:
             
             # Calculate summary
             summary = self.token_tracker.get_summary()
-            total_cost = self.cost_calculator.calculate_cost(
-                summary['total_prompt_tokens'],
-                summary['total_completion_tokens']
-            )
+            total_cost = self.cost_calculator.summary_cost(summary)
             
-            return {
+            yield {"event": "result", "data": {
                 "status": "success",
                 "agents": self.agent_outputs,
                 "final_answer": final_answer or "No response generated",
@@ -586,21 +892,18 @@ class KhetSetu:
                     "total_completion_tokens": summary['total_completion_tokens'],
                     "total_cost_usd": round(total_cost, 6)
                 }
-            }
+            }}
             
         except Exception as e:
             print(f"Error in process_web_query: {e}")
-            import traceback
-            traceback.print_exc()
+            if _DEBUG:
+                traceback.print_exc()
             
             # Calculate summary even on error
             summary = self.token_tracker.get_summary()
-            total_cost = self.cost_calculator.calculate_cost(
-                summary['total_prompt_tokens'],
-                summary['total_completion_tokens']
-            )
+            total_cost = self.cost_calculator.summary_cost(summary)
             
-            return {
+            yield {"event": "result", "data": {
                 "status": "error",
                 "message": str(e),
                 "agents": self.agent_outputs,
@@ -610,14 +913,27 @@ class KhetSetu:
                     "total_completion_tokens": summary['total_completion_tokens'],
                     "total_cost_usd": round(total_cost, 6)
                 }
-            }
+            }}
+        finally:
+            # Don't leave the vision call running if we stopped early
+            if vision_task and not vision_task.done():
+                vision_task.cancel()
+
+
+async def _run_cli() -> None:
+    """Run the interactive session and release shared HTTP connections afterwards."""
+    khet_setu = KhetSetu()
+    try:
+        await khet_setu.main()
+    finally:
+        khet_setu.data_logger.close()
+        await close_resources()
 
 
 def main():
     """Entry point for the application."""
     try:
-        khet_setu = KhetSetu()
-        asyncio.run(khet_setu.main())
+        asyncio.run(_run_cli())
     except KeyboardInterrupt:
         print("\nProgram interrupted by user.")
     except Exception as e:
@@ -1,9 +1,11 @@
 """Agent Manager - Orchestrates multi-agent interactions."""
 
-from semantic_kernel.agents import AgentGroupChat
+from typing import Optional
+from semantic_kernel.agents import Agent, AgentGroupChat
+from semantic_kernel.contents import AuthorRole, ChatMessageContent
 from semantic_kernel.agents.strategies import (
     KernelFunctionSelectionStrategy,
-    KernelFunctionTerminationStrategy
+    TerminationStrategy
 )
 from semantic_kernel.functions import KernelFunctionFromPrompt
 from semantic_kernel.prompt_template.prompt_template_config import PromptTemplateConfig
@@ -19,6 +21,99 @@ from src.agents import (
 )
 
 
+# Agent that does the work for each parsed user intent
+INTENT_AGENTS = {
+    "weather_forecast": ForecastAgent.NAME,
+    "weather_history": WeatherHistoryAgent.NAME,
+    "get_solution": SolutionAgent.NAME,
+    "diagnose_from_image": VisionCropAgent.NAME,
+    "image_qna": VisionCropAgent.NAME,
+}
+APPROVAL_MARKER = "this solution is completely approved"
+COMPLETION_MARKER = "this conversation is complete."
+
+
+class RuleBasedSelectionStrategy(KernelFunctionSelectionStrategy):
+    """
+    Selection strategy that follows the fixed agent flow without an LLM call.
+    
+    PromptAgent -> intent agent -> ReviewerAgent, repeating the intent agent
+    and ReviewerAgent until approval, then PromptAgent. States outside this
+    flow (or an unknown intent) fall back to the selection prompt.
+    """
+
+    intent: Optional[str] = None
+
+    async def select_agent(self, agents: list[Agent], history: list[ChatMessageContent]) -> Agent:
+        """
+        Pick the next agent from the last agent message and the current intent.
+        
+        Args:
+            agents: Agents in the chat
+            history: Conversation history
+            
+        Returns:
+            The agent who takes the next turn
+        """
+        by_name = {agent.name: agent for agent in agents}
+        worker = INTENT_AGENTS.get(self.intent)
+
+        # Last message written by an agent (skips user, context and tool messages)
+        last = next(
+            (m for m in reversed(history) if m.role == AuthorRole.ASSISTANT and m.name in by_name),
+            None
+        )
+
+        next_name = None
+        if worker is not None:
+            if last is None:
+                next_name = PromptAgent.NAME
+            elif last.name == worker:
+                next_name = ReviewerAgent.NAME
+            elif last.name == ReviewerAgent.NAME:
+                approved = APPROVAL_MARKER in (last.content or "").lower()
+                next_name = PromptAgent.NAME if approved else worker
+            elif last.name == PromptAgent.NAME and not any(
+                m.name == ReviewerAgent.NAME for m in history
+            ):
+                next_name = worker
+
+        agent = by_name.get(next_name)
+        if agent is None:
+            return await super().select_agent(agents, history)
+        return agent
+
+
+class RuleBasedTerminationStrategy(TerminationStrategy):
+    """
+    Ends the chat once PromptAgent closes an approved conversation.
+    
+    A plain marker check replaces the per-turn termination prompt.
+    """
+
+    async def should_agent_terminate(self, agent: Agent, history: list[ChatMessageContent]) -> bool:
+        """
+        Check PromptAgent's last message and the reviewer's approval.
+        
+        Args:
+            agent: Agent that just spoke
+            history: Conversation history
+            
+        Returns:
+            True when PromptAgent said the conversation is complete after
+            ReviewerAgent approved the solution
+        """
+        if not history:
+            return False
+        last = history[-1]
+        if last.name != PromptAgent.NAME or COMPLETION_MARKER not in (last.content or "").lower():
+            return False
+        return any(
+            m.name == ReviewerAgent.NAME and APPROVAL_MARKER in (m.content or "").lower()
+            for m in reversed(history)
+        )
+
+
 class AgentManager:
     """
     Manages agent interactions and orchestrates the multi-agent conversation flow.
@@ -46,84 +141,19 @@ class AgentManager:
         reviewer_agent = ReviewerAgent.create(kernel)
         vision_agent = VisionCropAgent.create(kernel)
 
-        # Create termination strategy
-        termination_function = KernelFunctionFromPrompt(
-            function_name="termination",
-            prompt_template_config=PromptTemplateConfig(
-                template="""
-        Determine if the conversation is complete.
-
-        Criteria:
-        1. The SolutionReviewerAgent has stated explicitly "This solution is completely approved." and has no further recommendations or concerns.
-        Do not count messages that include phrases like "not approved," "needs improvement," "almost approved," or "would be approved if...".
-        2. The most recent message must be from PromptAgent. The PromptAgent must have said "This conversation is complete."
-
-        If both conditions are met, return: yes
-        Otherwise, return: no
-
-        History:
-        {{$history}}
-        """,
-                allow_dangerously_set_content=True
-            )
-        )
-
         # Create selection strategy
         selection_function = KernelFunctionFromPrompt(
             function_name="selection",
             prompt_template_config=PromptTemplateConfig(
                 template="""
-        Determine which participant takes the next turn in a conversation based on the most recent messages in the conversation history.
-        State only the name of the participant to take the next turn.
-        If the conversation is complete, respond with exactly "none".
-        No participant should take more than one turn in a row.
-
-        Always follow these rules, and ensure the conversation includes at least 4 turns before it can end:
-
-        General Flow:
-        - After the user input, PromptAgent always speaks first.
-        - Another agent MUST speak after PromptAgent speaks first.
-        When choosing the agent to speak next, follow one of the 4 branches below depending on user intent.
-
-        1. If the user's intent is to get a weather forecast:
-        - After PromptAgent replies, ForecastAgent responds.
-        - After ForecastAgent replies, ReviewerAgent provides feedback.
-        - If the ReviewerAgent says "This solution is completely approved.", PromptAgent responds and ends the conversation.
-        - Otherwise, ForecastAgent replies again with revisions, and ReviewerAgent must review again.
-        - Repeat this cycle until ReviewerAgent approves the solution.
-        - Then PromptAgent replies with "This conversation is complete.", and only then respond with "none".
-
-        2. If the user's intent is to get weather history:
-        - Same as above, but use WeatherHistoryAgent instead of ForecastAgent.
-
-        3. If the user's intent is to get a solution:
-        - Same pattern using SolutionAgent instead of ForecastAgent.
-
-        4. If the user's intent is to diagnose a crop from an image or answer an image-based question:
-        - After PromptAgent replies, VisionCropAgent responds.
-        - After VisionCropAgent replies, ReviewerAgent provides feedback.
-        - If the ReviewerAgent says "This solution is completely approved.", PromptAgent responds and ends the conversation.
-        - Otherwise, VisionCropAgent replies again with revisions, and ReviewerAgent must review again.
-        - Repeat this cycle until ReviewerAgent approves the solution.
-        - Then PromptAgent replies with "This conversation is complete.", and only then respond with "none".
-
-        Additional Enforcement Rules:
-        1. Choose only from these participants:
-        - PromptAgent
-        - WeatherHistoryAgent (only choose this if the user's intent is weather history)
-        - ForecastAgent (only choose this if the user's intent is weather forecast)
-        - SolutionAgent (only choose this if the user's intent is to get a solution to a problem)
-        - VisionCropAgent (only choose this if the user's intent is to diagnose from image or answer image-based question)
-        - ReviewerAgent
-
-        2. NEVER select the same agent twice in a row.
-        3. The conversation only ends when PromptAgent replies with "This conversation is complete.".
-        4. Do not return "none" unless the very last speaker was PromptAgent and they explicitly said "This conversation is complete."
-        5. Do NOT call or execute any kernel functions.
-        6. Only output the name of the next agent or "none".
+        Name the next speaker only, or "none".
+        WORKER by intent: weather_forecast=ForecastAgent, weather_history=WeatherHistoryAgent, get_solution=SolutionAgent, diagnose_from_image/image_qna=VisionCropAgent.
+        Flow: user -> PromptAgent -> WORKER -> ReviewerAgent; if not "This solution is completely approved." -> WORKER -> ReviewerAgent (repeat); once approved -> PromptAgent says "This conversation is complete." -> none.
+        Choose only PromptAgent, ReviewerAgent or the intent's WORKER. Never the same agent twice in a row. At least 4 turns.
+        "none" only if the last speaker is PromptAgent and said "This conversation is complete.". Never call kernel functions.
 
         History:
-        {{{{ $history }}}}
+        {{$history}}
         """,
                 allow_dangerously_set_content=True
             )
@@ -140,15 +170,11 @@ class AgentManager:
                 vision_agent,
                 reviewer_agent
             ],
-            termination_strategy=KernelFunctionTerminationStrategy(
-                agents=[reviewer_agent],
-                function=termination_function,
-                kernel=kernel,
-                result_parser=lambda result: str(result.value).strip().lower() == "yes",
-                history_variable_name="history",
+            termination_strategy=RuleBasedTerminationStrategy(
+                agents=[prompt_agent],
                 maximum_iterations=6,
             ),
-            selection_strategy=KernelFunctionSelectionStrategy(
+            selection_strategy=RuleBasedSelectionStrategy(
                 function=selection_function,
                 kernel=kernel,
                 result_parser=lambda result: (
@@ -161,3 +187,14 @@ class AgentManager:
         )
 
         return agent_group_chat
+
+    @staticmethod
+    def set_intent(chat: AgentGroupChat, user_intent: str) -> None:
+        """
+        Tell the chat's selection strategy which intent agent to route to.
+        
+        Args:
+            chat: The AgentGroupChat from create_agent_group_chat()
+            user_intent: Parsed user intent
+        """
+        chat.selection_strategy.intent = user_intent
@@ -0,0 +1,31 @@
+"""Shared helpers for building agents."""
+
+import functools
+from typing import Callable
+
+from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.kernel import Kernel
+
+
+def per_kernel(build: Callable[[Kernel], ChatCompletionAgent]) -> Callable[[Kernel], ChatCompletionAgent]:
+    """
+    Cache an agent factory so each kernel gets one shared agent instance.
+    
+    Args:
+        build: Function that builds the agent for a kernel
+        
+    Returns:
+        Function returning the cached agent, building it on first use
+    """
+    agents = {}  # id(kernel) -> agent
+
+    @functools.wraps(build)
+    def create(kernel: Kernel) -> ChatCompletionAgent:
+        agent = agents.get(id(kernel))
+        if agent is None:
+            agent = build(kernel)
+            # The agent keeps its kernel alive, so the id is never reused
+            agents[id(kernel)] = agent
+        return agent
+
+    return create
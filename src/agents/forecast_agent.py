@@ -1,8 +1,14 @@
 """Forecast Agent - Provides weather forecast data."""
 
+import textwrap
+
 from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
+from semantic_kernel.functions import KernelArguments
 from semantic_kernel.kernel import Kernel
 
+from src.agents.factory import per_kernel
+
 
 class ForecastAgent:
     """
@@ -13,52 +19,47 @@ class ForecastAgent:
     """
 
     NAME = "ForecastAgent"
-    INSTRUCTIONS = """
-    == Objective == 
-    You are an AI Agent whose job is to call get_forecast() and summarize weather forecast data for a given location. You will receive:
-    - A location (string)
-    - A numbered labeled 'date'. 
-
-    ==Tools==
-    The only tool you have access to in the kernel is the get_forecast(location, forecast_date) function, which will provide you with weather forecast data for the specified location and date.
-    Use NO OTHER TOOL. The only function you should call is the get_forecast() function.
+    INSTRUCTIONS = textwrap.dedent("""
+    == Objective ==
+    Call get_forecast(location, forecast_date) and summarize the weather forecast it returns.
 
     == Input ==
-    You will receive an input of an object with the following values: location and forecast_date.
-    For example,
-    {
-    "location": "New York, New York",
-    "forecast_date": 0
-    }
+    An object with "location" (string) and "forecast_date" (days from today with 0 = today, a "YYYY-MM-DD" date, or a list of days for a range), e.g.
+    {"location": "New York, New York", "forecast_date": 0}
+    For a list, get_forecast returns one summary per day: summarize them together, grouping similar days.
+    Pass these values unchanged as the matching get_forecast arguments. Call NO OTHER function.
 
-    When calling get_forecast(location, forecast_date):
-    -For the location argument of get_forecast: ONLY USE the input argument labeled "location" 
-    -For the forecast_date argument of get_forecast: ONLY USE the input argument labeled "date"
+    == Output ==
+    - Reply in the user's language and dialect (e.g. Spanish or Swahili); for Hinglish, use a natural Hindi-English mix.
+    - Answer the user's question from the get_forecast results only, with just the information needed.
+    - Be specific but brief: a few lines, never more than 8000 tokens.
+    """).strip()
 
-    ==Output==
-    - Keep all output messages under 8000 tokens. Make sure messages arent too long.
-    - Answer using the language and dialect used by the user. For example, if they are talking in Spanish, respond in Spanish.
-    - For Hinglish (Hindi and English mix), respond in a natural mix of Hindi and English, or primarily in Hindi with some English words.
-    - Use the information obtained by get_forecast(location, forecast_date) to answer the user's question.
-    - Only give information that asked for and is absolutely necessary.
-    - Be as detailed as possible but also be brief. Not too many lines of output.
-    - Example: If the user is asking for the weather for TODAY (forecast_date should be 0 in this case), 
-        then use the results from get_forecast(location, forecast_date) to output a summary of the weather forecast information obtained by that function.
-    """
+    TEMPERATURE = 0.0
+    MAX_TOKENS = 8000
 
     @staticmethod
+    @per_kernel
     def create(kernel: Kernel) -> ChatCompletionAgent:
         """
-        Create a ForecastAgent instance.
+        Return the ForecastAgent instance for a kernel, creating it on first use.
         
         Args:
             kernel: Semantic Kernel instance with configured services
             
         Returns:
-            Configured ChatCompletionAgent for ForecastAgent
+            Configured ChatCompletionAgent for ForecastAgent, shared per kernel
         """
         return ChatCompletionAgent(
             kernel=kernel,
             name=ForecastAgent.NAME,
-            instructions=ForecastAgent.INSTRUCTIONS
+            instructions=ForecastAgent.INSTRUCTIONS,
+            # Reply length cap from the instructions, and sampling settings
+            arguments=KernelArguments(
+                settings=OpenAIChatPromptExecutionSettings(
+                    max_tokens=ForecastAgent.MAX_TOKENS,
+                    temperature=ForecastAgent.TEMPERATURE,
+                    seed=42
+                )
+            )
         )
@@ -1,8 +1,33 @@
 """Parse Agent - Extracts structured data from user input."""
 
+import textwrap
+from typing import List, Literal, Optional, Union
+
+from pydantic import BaseModel
 from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
+from semantic_kernel.functions import KernelArguments
 from semantic_kernel.kernel import Kernel
 
+from src.agents.factory import per_kernel
+
+
+class ParseResult(BaseModel):
+    """Schema the ParseAgent reply is constrained to (OpenAI structured outputs)."""
+
+    user_intent: Literal[
+        "weather_forecast",
+        "weather_history",
+        "get_solution",
+        "diagnose_from_image",
+        "image_qna",
+    ]
+    location: Optional[str]
+    start_year: int
+    end_year: int
+    forecast_date: Union[int, str, List[int]]
+    has_image: bool
+
 
 class ParseAgent:
     """
@@ -13,14 +38,8 @@ class ParseAgent:
     """
 
     NAME = "ParseAgent"
-    INSTRUCTIONS = """
-    You are an AI agent whose job is to extract structured information from a user's natural language request. 
-    You will provide this information in JSON format so it can be passed to other agents (Weather Forecast Agent, Weather History Agent, Solution Agent, Vision Crop Agent).
-    **ONLY RETURN VALID JSON IN THE FORMAT LISTED BELOW.
-
-    ## Responsibilities
-
-    Given the input
+    INSTRUCTIONS = textwrap.dedent("""
+    You are an AI agent whose job is to extract structured information from a user's natural language request, as JSON for the other agents (Weather Forecast Agent, Weather History Agent, Solution Agent, Vision Crop Agent).
 
     Extract the following:
 
@@ -31,73 +50,44 @@ class ParseAgent:
         - "diagnose_from_image" → user is providing an image and wants diagnosis (pest/disease/health)
         - "image_qna" → user is providing an image and asking a general question about it
 
-    2. **location**: Extract the location (e.g., city, state, or country) that the user is asking about. If none is found, return `null`.
+    2. **location**: The location (e.g., city, state, or country) that the user is asking about, or null if none is found.
 
-    3. **start_year** and **end_year**: If the user is asking for historical data, extract them. Otherwise, default to:
-        - start_year: 2015
-        - end_year: 2025
+    3. **start_year** and **end_year**: The years of historical data asked for; otherwise 2015 and 2025.
 
-    4. **forecast_date**: Determine the forecast target:
-        - 0 → if user asks for weather "today"
-        - A positive int → number of days in the future from datetime.now (e.g., 3 days from now → 3)
-        - A negative int → number of days in the past from datetime.now (e.g., 22 days ago → -22)
+    4. **forecast_date**: The forecast target:
+        - 0 → weather "today", or no forecast date mentioned
+        - A positive int → number of days in the future (e.g., 3 days from now → 3)
+        - A negative int → number of days in the past (e.g., 22 days ago → -22)
         - "YYYY-MM-DD" string → if an exact date is mentioned
-        - 0 if there is no forecast date mentioned.
-
-    5. **has_image**: Boolean flag indicating if an image is provided:
-        - true → if user mentions providing/attaching an image, photo, picture, or screenshot
-        - false → otherwise
-
-    == Input==
-    Given the input:
+        - A list of ints → a range of days (e.g., the next 3 days → [0, 1, 2]); at most 5 days
 
-    Extract these fields into JSON:
-    
-    {
-    "user_intent": ...,
-    "location": ...,
-    "start_year": ...,
-    "end_year": ...,
-    "forecast_date": ...,
-    "has_image": ...
-    }
-
-    Return only valid JSON.
-   
-    Example 1 (Weather query):
-    {
-    "user_intent": "weather_forecast",
-    "location": "Bayonne, New Jersey",
-    "start_year": 2015,
-    "end_year": 2025,
-    "forecast_date": 0,
-    "has_image": false
-    }
-
-    Example 2 (Image diagnosis query):
-    {
-    "user_intent": "diagnose_from_image",
-    "location": null,
-    "start_year": 2015,
-    "end_year": 2025,
-    "forecast_date": 0,
-    "has_image": true
-    }
-    """
+    5. **has_image**: true if the user mentions providing/attaching an image, photo, picture, or screenshot; otherwise false.
+    """).strip()
 
     @staticmethod
+    @per_kernel
     def create(kernel: Kernel) -> ChatCompletionAgent:
         """
-        Create a ParseAgent instance.
+        Return the ParseAgent instance for a kernel, creating it on first use.
         
         Args:
             kernel: Semantic Kernel instance with configured services
             
         Returns:
-            Configured ChatCompletionAgent for ParseAgent
+            Configured ChatCompletionAgent for ParseAgent, shared per kernel
         """
         return ChatCompletionAgent(
             kernel=kernel,
             name=ParseAgent.NAME,
-            instructions=ParseAgent.INSTRUCTIONS
+            instructions=ParseAgent.INSTRUCTIONS,
+            # gpt-4o-mini ("mini" service from KernelConfig), constrained
+            # to the ParseResult JSON schema
+            arguments=KernelArguments(
+                settings=OpenAIChatPromptExecutionSettings(
+                    service_id="mini",
+                    response_format=ParseResult,
+                    temperature=0,
+                    seed=42
+                )
+            )
         )
@@ -1,8 +1,35 @@
 """Solution Agent - Generates agricultural solutions and recommendations."""
 
+import csv
+import textwrap
+from pathlib import Path
+
 from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
+from semantic_kernel.functions import KernelArguments
 from semantic_kernel.kernel import Kernel
 
+from src.agents.factory import per_kernel
+
+_ADAPTATIONS_PATH = Path(__file__).resolve().parents[2] / "datasets" / "adaptations.txt"
+
+
+def _load_adaptations() -> str:
+    """
+    Read the adaptations dataset as one compact line per region and element.
+    
+    Returns:
+        Lines like "- Kitui, Kenya / Temperature: Irrigation; Water harvesting"
+    """
+    grouped = {}
+    with open(_ADAPTATIONS_PATH, newline="") as file:
+        reader = csv.reader(file)
+        next(reader)  # Region,Element,Adaptation Options
+        for region, element, *option in reader:
+            # Some options contain unquoted commas, e.g. "(e.g., SRI)"
+            grouped.setdefault(f"{region} / {element}", []).append(",".join(option).strip())
+    return "\n".join(f"- {key}: {'; '.join(options)}" for key, options in grouped.items())
+
 
 class SolutionAgent:
     """
@@ -13,50 +40,50 @@ class SolutionAgent:
     """
 
     NAME = "SolutionAgent"
-    INSTRUCTIONS = """
-    You are an AI agent tasked with generating answers to agricultural questions asked by users.
-    
+    INSTRUCTIONS = textwrap.dedent("""
+    You are an AI agent that answers users' agricultural questions.
+
     == Objective ==
-    Your goal is to:
-    1. Provide clear, actionable solutions to answer the queries of the user. 
-    2. Suggestions must answer the user's question. They can include but are not limited to agricultural techniques that suit the local climate and socio-economic conditions. You can provide brief forecast and historical weather conditions from the chat context as well.
-    3. Recommend sustainable practices and a few implementation steps to answer the user's question to improve resilience and productivity under agricultural problems the user may have within their local community. You can include the names of local resources of help according to the user's question and location.
+    Give clear, actionable, sustainable solutions that answer the user's question and suit the local climate and socio-economic conditions, with a few implementation steps. You may cite the forecast and weather history from the chat context and name local resources that can help.
 
     == Inputs ==
-    You will receive the following inputs to assist you in formulating your answer.
-    1. A string containing the "User request" (the user's query).
-    2. Weather Forecast Data from the weather forecast agent describing the weather conditions for the time of interest (this information is in the chat context)
-    3. Weather History Data from the weather history agent describing the historical weather conditions for the time of interest (this information is in the chat context)
-    4. Adaptation strategies. These are obtained using the kernel function get_adaptations and are some examples of adaptation strategies to climate problems adopted by farmers in the past you can use to form your answer.
-    
-    Use these inputs to answer the user's query.
+    1. The user's request.
+    2. Weather forecast and weather history data from the other agents (in the chat context).
+    3. Adaptation strategies adopted by farmers in the past, listed under Past Adaptations below.
 
     == Output ==
-    Keep all output messages under 8000 tokens. Make sure messages arent too long.
-    Answer using the language and dialect used by the user. For example, if they are talking in Swahili, translate your response in Swahili for your output.
-    For Hinglish (Hindi and English mix), respond in a natural mix of Hindi and English, or primarily in Hindi with some English words as is common in Indian communication.
-    Your responses should be complete, practical to the smallscale and large local farmers of that area. Make sure they can implement to reduce risk and improve yields under local conditions.
-    Your answer should be detailed and complete.
-    Make sure it answers every part of the user's input. If the user asks more than one question, make sure the solution provided answers every part of the question.
-        For example: For the input: "What are the climate problems of Guatemala and what can farmers do to protect their crops. What if there is sudden heavy rainfall in that area?", make sure to answer
-        what the climate problems already are, what farmers can do to protect their crops, AND what to do if there is heavy rainfall. Answer every sentence.
-    Keep the answer detailed with all the information you need BUT NOT TOO LONG.
-    Consider suggestions when refining an idea.
-    """
+    - Reply in the user's language and dialect (e.g. Spanish or Swahili); for Hinglish, use a natural Hindi-English mix.
+    - Be practical for small-scale and large local farmers, to reduce risk and improve yields under local conditions.
+    - Answer every part of the user's input. E.g. for "What are the climate problems of Guatemala and what can farmers do to protect their crops. What if there is sudden heavy rainfall in that area?", cover the climate problems, crop protection AND heavy rainfall.
+    - Be detailed and complete but not too long (under 1200 words).
+    - Take reviewer suggestions into account when refining an answer.
+    """).strip() + "\n\n== Past Adaptations ==\n" + _load_adaptations()
+
+    TEMPERATURE = 0.3  # Some variety in phrasing
+    MAX_TOKENS = 2048
 
     @staticmethod
+    @per_kernel
     def create(kernel: Kernel) -> ChatCompletionAgent:
         """
-        Create a SolutionAgent instance.
+        Return the SolutionAgent instance for a kernel, creating it on first use.
         
         Args:
             kernel: Semantic Kernel instance with configured services
             
         Returns:
-            Configured ChatCompletionAgent for SolutionAgent
+            Configured ChatCompletionAgent for SolutionAgent, shared per kernel
         """
         return ChatCompletionAgent(
             kernel=kernel,
             name=SolutionAgent.NAME,
-            instructions=SolutionAgent.INSTRUCTIONS
+            instructions=SolutionAgent.INSTRUCTIONS,
+            # Hard reply length cap (output tokens dominate the cost), and sampling settings
+            arguments=KernelArguments(
+                settings=OpenAIChatPromptExecutionSettings(
+                    max_tokens=SolutionAgent.MAX_TOKENS,
+                    temperature=SolutionAgent.TEMPERATURE,
+                    seed=42
+                )
+            )
         )
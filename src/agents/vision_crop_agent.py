@@ -1,8 +1,14 @@
 """Vision Crop Agent - Analyzes crop images and provides field/crop diagnostics."""
 
+import textwrap
+
 from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
+from semantic_kernel.functions import KernelArguments
 from semantic_kernel.kernel import Kernel
 
+from src.agents.factory import per_kernel
+
 
 class VisionCropAgent:
     """
@@ -15,41 +21,17 @@ class VisionCropAgent:
     """
 
     NAME = "VisionCropAgent"
-    INSTRUCTIONS = """
+    INSTRUCTIONS = textwrap.dedent("""
     == Objective ==
     You are an AI Agent specialized in crop and field image analysis. Your primary job is to analyze crop/field images and answer user questions based on visual analysis results.
 
     == YOUR TASK ==
-    1. Read the conversation history for "VISION ANALYSIS RESULTS (JSON)"
-    2. Parse the JSON to extract analysis data
-    3. Use the analysis to answer the user's question comprehensively
-    4. Provide actionable insights and recommendations
-
-    == VISION ANALYSIS RESULTS FORMAT ==
-    The context will contain analysis results in this JSON structure:
-    {
-        "observations": {
-            "crop_type": "identified crop type",
-            "growth_stage": "growth stage",
-            "visual_stress": ["stress symptoms"],
-            "pests_diseases": ["detected issues"],
-            "weeds_detected": true/false,
-            "irrigation_status": "status",
-            "soil_conditions": "conditions",
-            "anomalies": ["unusual features"]
-        },
-        "likely_crop": [
-            {"name": "crop name", "confidence": 0.95}
-        ],
-        "issues": [
-            {"name": "issue", "evidence": "visual evidence", "confidence": 0.85}
-        ],
-        "recommended_next_photos": ["photo suggestions"],
-        "answer": "preliminary answer"
-    }
+    1. Read the "VISION ANALYSIS" brief in the conversation history
+    2. Use the analysis to answer the user's question comprehensively
+    3. Provide actionable insights and recommendations
 
     == WHAT TO DO WITH THE ANALYSIS ==
-    After extracting the JSON analysis, provide a comprehensive response that includes:
+    Using the analysis brief, provide a comprehensive response that includes:
 
     1. **Crop Identification** - State the identified crop type(s) with confidence levels
     2. **Growth Stage** - Describe the plant's current growth stage
@@ -69,7 +51,7 @@ class VisionCropAgent:
 
     == OUTPUT GUIDELINES ==
     - Keep all output under 8000 tokens
-    - Reference the analysis confidence scores (0-1 scale)
+    - Reference the confidence percentages from the analysis
     - Be specific and evidence-based
     - For serious issues, recommend professional agronomist consultation
     - Use the user's language (if Hinglish, use Hindi-English mix)
@@ -78,7 +60,7 @@ class VisionCropAgent:
 
     == ERROR HANDLING ==
     If analysis shows:
-    - "answer": "Unable to analyze image clearly" → Ask for clearer photo with specific tips
+    - Preliminary answer "Unable to analyze image clearly" → Ask for clearer photo with specific tips
     - Empty observations → Image may be unclear or not a crop; request better photo
     - Errors in analysis → Acknowledge and ask user to provide different photo
 
@@ -88,18 +70,21 @@ class VisionCropAgent:
     - Clearly state confidence levels and uncertainties
     - Recommend expert consultation for serious diagnoses
     - Be helpful and actionable in your recommendations
-    """
+    """).strip()
+
+    MAX_TOKENS = 8000
 
     @staticmethod
+    @per_kernel
     def create(kernel: Kernel) -> ChatCompletionAgent:
         """
-        Create a VisionCropAgent instance.
+        Return the VisionCropAgent instance for a kernel, creating it on first use.
         
         Args:
             kernel: Semantic Kernel instance with configured services
             
         Returns:
-            Configured ChatCompletionAgent for VisionCropAgent
+            Configured ChatCompletionAgent for VisionCropAgent, shared per kernel
             
         Raises:
             ValueError: If kernel is not properly configured
@@ -110,5 +95,12 @@ class VisionCropAgent:
         return ChatCompletionAgent(
             kernel=kernel,
             name=VisionCropAgent.NAME,
-            instructions=VisionCropAgent.INSTRUCTIONS
+            instructions=VisionCropAgent.INSTRUCTIONS,
+            # Reply length cap from the instructions, and a fixed seed
+            arguments=KernelArguments(
+                settings=OpenAIChatPromptExecutionSettings(
+                    max_tokens=VisionCropAgent.MAX_TOKENS,
+                    seed=42
+                )
+            )
         )
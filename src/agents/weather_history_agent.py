@@ -1,8 +1,14 @@
 """History Agent - Provides historical weather data."""
 
+import textwrap
+
 from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.connectors.ai.open_ai import OpenAIChatPromptExecutionSettings
+from semantic_kernel.functions import KernelArguments
 from semantic_kernel.kernel import Kernel
 
+from src.agents.factory import per_kernel
+
 
 class WeatherHistoryAgent:
     """
@@ -13,55 +19,47 @@ class WeatherHistoryAgent:
     """
 
     NAME = "WeatherHistoryAgent"
-    INSTRUCTIONS = """
-    You are an AI agent designed to provide accurate information of the weather history of a specified location. 
-
+    INSTRUCTIONS = textwrap.dedent("""
     == Objective ==
-    Your job is to summarize historical weather data for a given location and time period. 
-    
-    == Inputs ==
-    You will receive an input with the following arguments:
-    - A location (labeled in the input as "location", it is a string)
-    - A start year (labeled in the input as "start_year", it is an int)
-    - An end year (labeled in the input as "end_year", it is an int)
+    Summarize the historical weather of a location over a period using get_NASA_data(location, start_year, end_year), which returns:
+    - T2M: monthly average temperature at 2 meters (°C)
+    - PRECTOT: monthly total precipitation (mm)
 
-    ==Tools==
-    The only tool you have access to in the kernel is the get_NASA_data(location, start_year, end_year) function, which will provide you with:
-    - T2M (Monthly average temperature of the location at 2 meters in degrees celsius)
-    - PRECTOT (Monthly total precipitation in mm)
-    Use NO OTHER TOOL. The only function you should call is the get_NASA_data() function.
+    == Input ==
+    "location" (string), "start_year" (int) and "end_year" (int). Pass them unchanged as the matching get_NASA_data arguments. Call NO OTHER function.
 
-    When calling get_forecast(location, start_year, end_year):
-    -For the location argument of get_NASA_data: ONLY USE the input argument labeled "location" 
-    -For the start_year argument of get_NASA_data: ONLY USE the input argument labeled "start_year"
-    -For the end_year argument of get_NASA_data: ONLY USE the input argument labeled "end_year"
+    == Output ==
+    - Example: "From 2015 to 2025 in Bayonne, New Jersey, the average temperature increased slightly while rainfall remained stable, with drier months observed in summer."
+    - Reply in the user's language and dialect (e.g. Spanish or Swahili); for Hinglish, use a natural Hindi-English mix.
+    - Be specific but brief: a few lines, never more than 8000 tokens.
+    - Only summarize what the weather history returns: no solutions or adaptations, no future weather or predictions, no mention of kernel functions or other agents.
+    """).strip()
 
-    == Output Example ==
-    - "From 2015 to 2025 in Bayonne, New Jersey, the average temperature increased slightly while rainfall remained stable, with drier months observed in summer."
-    - Only give information that is absolutely necessary.
-    - Be as detailed as possible but also be brief. Not too many lines of output.
-    
-    == Rules ==
-    - Keep all output messages under 8000 tokens. Make sure messages arent too long.
-    - Do NOT generate a solution or adaptation.
-    - Do NOT talk about future weather or predictions.
-    - Do NOT mention any kernel functions or other agents.
-    - Only summarize what the weather history returns.
-    """
+    TEMPERATURE = 0.0
+    MAX_TOKENS = 8000
 
     @staticmethod
+    @per_kernel
     def create(kernel: Kernel) -> ChatCompletionAgent:
         """
-        Create a WeatherHistoryAgent instance.
+        Return the WeatherHistoryAgent instance for a kernel, creating it on first use.
         
         Args:
             kernel: Semantic Kernel instance with configured services
             
         Returns:
-            Configured ChatCompletionAgent for WeatherHistoryAgent
+            Configured ChatCompletionAgent for WeatherHistoryAgent, shared per kernel
         """
         return ChatCompletionAgent(
             kernel=kernel,
             name=WeatherHistoryAgent.NAME,
-            instructions=WeatherHistoryAgent.INSTRUCTIONS
+            instructions=WeatherHistoryAgent.INSTRUCTIONS,
+            # Reply length cap from the instructions, and sampling settings
+            arguments=KernelArguments(
+                settings=OpenAIChatPromptExecutionSettings(
+                    max_tokens=WeatherHistoryAgent.MAX_TOKENS,
+                    temperature=WeatherHistoryAgent.TEMPERATURE,
+                    seed=42
+                )
+            )
         )
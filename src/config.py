@@ -1,26 +1,50 @@
 """Configuration module for kernel and cost calculations."""
 
-import os
-from openai import AsyncOpenAI
-from semantic_kernel.kernel import Kernel
-from semantic_kernel.connectors.ai.open_ai import OpenAIChatCompletion
-from kernel_functions import get_NASA_data, get_adaptations, get_forecast, analyze_crop_image
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from semantic_kernel.kernel import Kernel
+
+# Serializes the first kernel build between warmup() and request handlers
+_kernel_lock = threading.Lock()
 
 
 class KernelConfig:
     """Configuration and setup for Semantic Kernel."""
 
     @staticmethod
-    def create_kernel() -> Kernel:
+    def create_kernel() -> "Kernel":
         """
         Create and configure a Semantic Kernel instance with OpenAI chat completion.
         
+        The kernel is built once per process and shared by every caller.
+        
         Returns:
             Configured Kernel instance with climate tools
         """
+        with _kernel_lock:
+            return KernelConfig._build_kernel()
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _build_kernel() -> "Kernel":
+        # Import here so that importing src (e.g. for CostCalculator) doesn't
+        # load semantic_kernel, openai and the tool module
+        from semantic_kernel.kernel import Kernel
+        from semantic_kernel.connectors.ai.open_ai import OpenAIChatCompletion
+        from kernel_functions import (
+            get_NASA_data,
+            get_forecast,
+            analyze_crop_image,
+            get_openai_client
+        )
+
         kernel = Kernel()
 
-        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Shares the pooled keep-alive connections used by the climate tools
+        client = get_openai_client()
 
         kernel.add_service(
             OpenAIChatCompletion(
@@ -29,6 +53,15 @@ class KernelConfig:
             )
         )
 
+        # Cheaper model for structured extraction (ParseAgent)
+        kernel.add_service(
+            OpenAIChatCompletion(
+                ai_model_id="gpt-4o-mini",
+                service_id="mini",
+                async_client=client,
+            )
+        )
+
         # Add climate tools
         kernel.add_function(
             plugin_name="climate_tools",
@@ -42,12 +75,6 @@ class KernelConfig:
             function=get_forecast
         )
 
-        kernel.add_function(
-            plugin_name="climate_tools",
-            function_name="get_adaptations",
-            function=get_adaptations
-        )
-
         # Add vision tools
         kernel.add_function(
             plugin_name="vision_tools",
@@ -58,25 +85,58 @@ class KernelConfig:
         return kernel
 
 
+def warmup() -> None:
+    """Build the shared kernel ahead of the first request (safe to call from a thread)."""
+    KernelConfig.create_kernel()
+
+
+# (input, output) pricing per token (USD) for each model in use
+_RATES = {
+    "gpt-4o": (2.50 / 1_000_000, 10.00 / 1_000_000),
+    "gpt-4o-mini": (0.15 / 1_000_000, 0.60 / 1_000_000),
+}
+
+
 class CostCalculator:
     """Calculate costs for OpenAI API usage."""
 
     @staticmethod
-    def calculate_cost(prompt_tokens: int, completion_tokens: int) -> float:
+    def calculate_cost(prompt_tokens: int, completion_tokens: int, model: str = "gpt-4o") -> float:
         """
-        Calculate cost for GPT-4o usage.
+        Calculate cost for one model's usage.
         
-        Pricing:
-        - Input: $2.50 per 1M tokens
-        - Output: $10.00 per 1M tokens
+        Pricing per 1M tokens:
+        - gpt-4o: $2.50 input, $10.00 output
+        - gpt-4o-mini: $0.15 input, $0.60 output
         
         Args:
             prompt_tokens: Number of prompt tokens used
             completion_tokens: Number of completion tokens generated
+            model: Model the tokens were billed on
+            
+        Returns:
+            Total cost in USD
+        """
+        input_rate, output_rate = _RATES[model]
+        return prompt_tokens * input_rate + completion_tokens * output_rate
+
+    @staticmethod
+    def summary_cost(summary: dict) -> float:
+        """
+        Calculate the cost of a TokenTracker summary.
+        
+        Tokens of agents on the "mini" service are priced at gpt-4o-mini
+        rates, the rest at gpt-4o rates.
+        
+        Args:
+            summary: Token summary from TokenTracker.get_summary()
             
         Returns:
             Total cost in USD
         """
-        input_cost = (prompt_tokens / 1_000_000) * 2.50
-        output_cost = (completion_tokens / 1_000_000) * 10.00
-        return input_cost + output_cost
+        mini_prompt = summary['mini_prompt_tokens']
+        mini_completion = summary['mini_completion_tokens']
+        return CostCalculator.calculate_cost(
+            summary['total_prompt_tokens'] - mini_prompt,
+            summary['total_completion_tokens'] - mini_completion
+        ) + CostCalculator.calculate_cost(mini_prompt, mini_completion, "gpt-4o-mini")
@@ -6,6 +6,8 @@ from src.utils.language_detection import (
     detect_user_language,
 )
 from src.utils.logging_handler import DataLogger, TokenTracker
+from src.utils.cache import LRUCache
+from src.utils.fast_parse import fast_parse
 
 __all__ = [
     'is_hinglish',
@@ -13,4 +15,6 @@ __all__ = [
     'detect_user_language',
     'DataLogger',
     'TokenTracker',
+    'LRUCache',
+    'fast_parse',
 ]
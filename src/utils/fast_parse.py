@@ -0,0 +1,66 @@
+"""Rule-based parsing of common forecast phrasings, without an LLM call."""
+
+import re
+from typing import Optional
+
+# A location word; it never starts a date phrase, so "Pune day after tomorrow"
+# leaves "day after tomorrow" to the date group
+_WORD = r"(?!(?:today|tomorrow|day|in \d)\b)[a-z][a-z.'-]*"
+# Up to three words, optionally followed by ", region" of up to three words
+_LOCATION = rf"(?P<location>{_WORD}(?: {_WORD}){{0,2}}(?:, ?{_WORD}(?: {_WORD}){{0,2}})?)"
+_WHEN = (
+    r"(?P<when>today|tomorrow|day after tomorrow"
+    r"|in (?P<ahead>\d{1,2}) days?|(?P<from_now>\d{1,2}) days? from now)"
+)
+_LEAD = r"(?:(?:what(?:'s| is) the |how is the |how's the )?(?:weather|forecast|weather forecast))"
+
+# The whole message must match, so anything beyond a plain forecast request
+# (a crop, a problem, a second question) falls through to the ParseAgent
+_PATTERNS = (
+    re.compile(rf"^{_LEAD} (?:in|for|at) {_LOCATION} {_WHEN}\s*[?.!]*$", re.IGNORECASE),
+    re.compile(rf"^{_LEAD} {_WHEN} (?:in|for|at) {_LOCATION}\s*[?.!]*$", re.IGNORECASE),
+)
+
+_RELATIVE_DAYS = {"today": 0, "tomorrow": 1, "day after tomorrow": 2}
+
+# Words the location group must not swallow
+_NOT_LOCATIONS = frozenset({
+    "my", "the", "our", "crop", "crops", "farm", "field", "day", "after", "next", "this"
+})
+
+
+def fast_parse(text: str) -> Optional[dict]:
+    """
+    Parse simple forecast requests like "weather in Pune tomorrow".
+
+    Args:
+        text: Raw user input
+
+    Returns:
+        Dictionary in the ParseAgent output format, or None if the input is
+        not a plain forecast request
+    """
+    text = " ".join(text.split())
+    for pattern in _PATTERNS:
+        match = pattern.match(text)
+        if match:
+            break
+    else:
+        return None
+
+    location = match.group("location")
+    if _NOT_LOCATIONS.intersection(location.lower().replace(",", " ").split()):
+        return None
+
+    when = match.group("when").lower()
+    days = match.group("ahead") or match.group("from_now")
+    forecast_date = int(days) if days else _RELATIVE_DAYS[when]
+
+    return {
+        "user_intent": "weather_forecast",
+        "location": location,
+        "start_year": 2015,
+        "end_year": 2025,
+        "forecast_date": forecast_date,
+        "has_image": False,
+    }
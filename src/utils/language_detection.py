@@ -1,10 +1,80 @@
 """Language detection utilities for multi-lingual support."""
 
+import os
 import re
+from functools import lru_cache
 from typing import Tuple
-from langdetect import detect, LangDetectException
+from langdetect import LangDetectException
+from langdetect.detector_factory import DetectorFactory, PROFILES_DIRECTORY
 from datasets.languages import languages
 
+# Optional fastText language ID model (pip install fasttext, then download
+# lid.176.ftz and point KHETSETU_LID_MODEL at it); langdetect is the fallback
+_lid_model = None
+if os.getenv("KHETSETU_LID_MODEL"):
+    try:
+        import fasttext
+        _lid_model = fasttext.load_model(os.getenv("KHETSETU_LID_MODEL"))
+    except (ImportError, ValueError) as e:
+        print(f"Warning: fastText language ID unavailable, using langdetect: {e}")
+
+_DEVANAGARI_RE = re.compile(r'[\u0900-\u097F]')
+_LATIN_RE = re.compile(r'[a-zA-Z]')
+_SCRIPT_RE = re.compile(r'[\u0900-\u097Fa-zA-Z]')
+
+# Private langdetect factory, built on first use. It scores only the languages
+# in datasets.languages, or the comma-separated KHETSETU_LANGUAGES subset.
+_factory = None
+
+
+def _load_factory() -> DetectorFactory:
+    """
+    Build a langdetect factory from the profiles of the supported languages.
+    
+    Returns:
+        Seeded DetectorFactory with one profile per supported language
+    """
+    wanted = os.getenv("KHETSETU_LANGUAGES")
+    codes = [code.strip() for code in wanted.split(",")] if wanted else list(languages)
+    profiles = []
+    for code in codes:
+        profile_path = os.path.join(PROFILES_DIRECTORY, code)
+        if os.path.isfile(profile_path):
+            with open(profile_path, encoding="utf-8") as file:
+                profiles.append(file.read())
+    factory = DetectorFactory()
+    factory.load_json_profile(profiles)
+    # langdetect samples n-grams at random; a fixed seed makes repeated
+    # detections of the same text agree
+    factory.set_seed(0)
+    return factory
+
+
+def _detect(text: str) -> str:
+    """
+    Detect the language code of a text with fastText if configured, else langdetect.
+    
+    Args:
+        text: The input text to analyze
+        
+    Returns:
+        ISO 639-1 style language code (e.g. "en", "hi")
+        
+    Raises:
+        LangDetectException: If langdetect finds no features in the text, or
+            fewer than two language profiles are configured
+    """
+    global _factory
+    if _lid_model is None:
+        if _factory is None:
+            _factory = _load_factory()
+        detector = _factory.create()
+        detector.append(text)
+        return detector.detect()
+    # predict() rejects newlines
+    labels, _ = _lid_model.predict(text.replace("\n", " "), k=1)
+    return labels[0].replace("__label__", "")
+
 
 def is_hinglish(text: str) -> bool:
     """
@@ -16,9 +86,36 @@ def is_hinglish(text: str) -> bool:
     Returns:
         True if both Devanagari and Latin scripts are present, False otherwise
     """
-    has_hindi = bool(re.search(r'[\u0900-\u097F]', text))
-    has_english = bool(re.search(r'[a-zA-Z]', text))
-    return has_hindi and has_english
+    # ASCII text can't contain Devanagari
+    if text.isascii():
+        return False
+    # One pass: find the first letter of either script, then look for the
+    # other script only in the rest of the text
+    first = _SCRIPT_RE.search(text)
+    if first is None:
+        return False
+    other = _LATIN_RE if _DEVANAGARI_RE.match(first.group()) else _DEVANAGARI_RE
+    return other.search(text, first.end()) is not None
+
+
+# Common Hindi words written in Latin script
+_HINGLISH_KEYWORDS = frozenset({
+    'mein', 'main', 'hai', 'hain', 'kya', 'kaise', 'ke', 'ki',
+    'aur', 'ka', 'ko', 'se', 'par', 'liye', 'chahiye', 'chahie',
+    'karna', 'hona', 'tha', 'thi', 'the', 'ho', 'kare', 'karo',
+    'nahi', 'nahin', 'kyun', 'kyu', 'kab', 'kahan', 'yahan', 'vahan',
+    'mujhe', 'tumhe', 'humne', 'unhe', 'iske', 'uske',
+    'fasal', 'kheti', 'barish', 'mausam', 'pani'
+})
+
+# Latin words of a keyword's length, matched case-insensitively so the input
+# is never copied by lower(); only these short candidates are lowercased
+_WORD_RE = re.compile(
+    r'(?<![a-z])[a-z]{%d,%d}(?![a-z])' % (
+        min(map(len, _HINGLISH_KEYWORDS)), max(map(len, _HINGLISH_KEYWORDS))
+    ),
+    re.IGNORECASE | re.ASCII
+)
 
 
 def is_romanized_hinglish(text: str) -> bool:
@@ -29,20 +126,30 @@ def is_romanized_hinglish(text: str) -> bool:
         text: The input text to analyze
         
     Returns:
-        True if at least 2 Hinglish keywords are found, False otherwise
+        True if at least 2 distinct Hinglish keywords are found, False otherwise
     """
-    hinglish_keywords = [
-        'mein', 'main', 'hai', 'hain', 'kya', 'kaise', 'ke', 'ki',
-        'aur', 'ka', 'ko', 'se', 'par', 'liye', 'chahiye', 'chahie',
-        'karna', 'hona', 'tha', 'thi', 'the', 'ho', 'kare', 'karo',
-        'nahi', 'nahin', 'kyun', 'kyu', 'kab', 'kahan', 'yahan', 'vahan',
-        'mujhe', 'tumhe', 'humne', 'unhe', 'iske', 'uske',
-        'fasal', 'kheti', 'barish', 'mausam', 'pani'
-    ]
+    # Distinct keywords, so English that repeats "the" doesn't count
+    seen = set()
+    for word in _WORD_RE.findall(text):
+        word = word.lower()
+        if word in _HINGLISH_KEYWORDS:
+            seen.add(word)
+            if len(seen) >= 2:
+                return True
+    return False
+
 
-    text_lower = text.lower()
-    matches = sum(1 for keyword in hinglish_keywords if keyword in text_lower)
-    return matches >= 2
+# Words that mark a short ASCII input as English (none are common words in
+# the other supported Latin-script languages)
+_ENGLISH_RE = re.compile(
+    r'\b(?:what|how|when|where|which|why|the|is|are|will|should|can|does|my|weather|forecast|hello|please)\b',
+    re.IGNORECASE
+)
+_SHORT_TEXT_CHARS = 40
+
+# Inputs up to this length are memoized; longer ones are rarely repeated and
+# would make the cache's memory use unbounded
+_CACHE_MAX_CHARS = 1024
 
 
 def detect_user_language(text: str) -> Tuple[str, str]:
@@ -50,6 +157,7 @@ def detect_user_language(text: str) -> Tuple[str, str]:
     Detect the user's language from input text.
     
     Special handling for Hinglish (Hindi+English mix) and romanized variations.
+    Results for repeated inputs are served from an LRU cache.
     
     Args:
         text: The input text to analyze
@@ -57,6 +165,13 @@ def detect_user_language(text: str) -> Tuple[str, str]:
     Returns:
         Tuple of (language_code, language_name)
     """
+    if len(text) > _CACHE_MAX_CHARS:
+        return _detect_user_language(text)
+    return _cached_detect_user_language(text)
+
+
+def _detect_user_language(text: str) -> Tuple[str, str]:
+    """Uncached implementation of detect_user_language."""
     # Check if it's Hinglish with Devanagari script
     if is_hinglish(text):
         return 'hi-en', 'Hinglish (Hindi and English)'
@@ -65,12 +180,17 @@ def detect_user_language(text: str) -> Tuple[str, str]:
     if is_romanized_hinglish(text):
         return 'hi-en', 'Hinglish (Hindi and English)'
 
+    # Short ASCII questions with an English function word are English; skip
+    # the statistical detector, which is also least reliable on short text
+    if len(text) < _SHORT_TEXT_CHARS and text.isascii() and _ENGLISH_RE.search(text):
+        return 'en', 'English'
+
     try:
-        detected_code = detect(text)
+        detected_code = _detect(text)
 
         # Handle commonly confused language detections
         if detected_code in ['tl', 'sw', 'id', 'so']:
-            has_hindi = bool(re.search(r'[\u0900-\u097F]', text))
+            has_hindi = bool(_DEVANAGARI_RE.search(text))
             if has_hindi:
                 return 'hi', 'Hindi'
             if is_romanized_hinglish(text):
@@ -79,7 +199,7 @@ def detect_user_language(text: str) -> Tuple[str, str]:
 
         # Verify Hindi detection
         if detected_code == 'hi':
-            has_hindi_script = bool(re.search(r'[\u0900-\u097F]', text))
+            has_hindi_script = bool(_DEVANAGARI_RE.search(text))
             if not has_hindi_script:
                 if is_romanized_hinglish(text):
                     return 'hi-en', 'Hinglish (Hindi and English)'
@@ -92,3 +212,6 @@ def detect_user_language(text: str) -> Tuple[str, str]:
         if is_romanized_hinglish(text):
             return 'hi-en', 'Hinglish (Hindi and English)'
         return 'en', 'English'
+
+
+_cached_detect_user_language = lru_cache(maxsize=4096)(_detect_user_language)
@@ -1,12 +1,51 @@
 """Logging and data handling utilities."""
 
+import atexit
+import csv
 import os
-import pandas as pd
+import threading
+import weakref
+from array import array
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# One tokens.txt entry; keys match TokenTracker.get_summary()
+_TOKEN_TEMPLATE = """
+Input: {input_id}
+PromptAgent tokens: {prompt_agent_tokens}
+ParseAgent tokens: {parse_tokens}
+ForecastAgent tokens: {forecast_tokens}
+WeatherHistoryAgent tokens: {history_tokens}
+SolutionAgent tokens: {solution_tokens}
+ReviewerAgent tokens: {reviewer_tokens}
+Total tokens: {total_tokens}
+Total prompt tokens: {total_prompt_tokens}
+Total completion tokens: {total_completion_tokens}
+Total cost (USD): ${total_cost:.6f}
+""".format
+
+# Loggers that may hold buffered rows; closed once at exit
+_live_loggers = weakref.WeakSet()
+
+
+@atexit.register
+def _close_live_loggers() -> None:
+    for logger in list(_live_loggers):
+        logger.close()
 
 
 class DataLogger:
     """Handle CSV logging for agent inputs and outputs."""
 
+    OUTPUT_COLUMNS = ['InputID', 'SequenceNumber', 'AgentName', 'Output']
+    INPUT_FLUSH_EVERY = 50
+
+    # Next free input ID per input log path, shared by all loggers in a process
+    _next_ids = {}
+    _next_ids_lock = threading.Lock()
+
     def __init__(self, logs_dir: str = "./logs"):
         """
         Initialize the data logger.
@@ -18,7 +57,15 @@ class DataLogger:
         self.input_csv_path = os.path.join(logs_dir, "input.csv")
         self.output_csv_path = os.path.join(logs_dir, "output.csv")
         self.tokens_txt_path = os.path.join(logs_dir, "tokens.txt")
+        self._token_file = None  # Opened on first log_token_usage()
+        self._input_file = None  # Opened on first log_input()
+        self._input_writer = None
+        self._pending_inputs = 0
+        self._output_file = None  # Opened on first log_output()
+        self._output_writer = None
         self._initialize_directories()
+        # Flush buffered rows even if the caller never calls close()
+        _live_loggers.add(self)
 
     def _initialize_directories(self) -> None:
         """Create logs directory if it doesn't exist."""
@@ -26,139 +73,199 @@ class DataLogger:
 
     def get_next_input_id(self) -> int:
         """
-        Get the next input ID based on existing logs.
+        Reserve the next input ID.
+        
+        The first call in a process scans the input log once for the highest
+        ID; later calls only increment an in-process counter.
         
         Returns:
             Next input ID to use
         """
+        with DataLogger._next_ids_lock:
+            next_id = DataLogger._next_ids.get(self.input_csv_path)
+            if next_id is None:
+                next_id = self._scan_next_input_id()
+            DataLogger._next_ids[self.input_csv_path] = next_id + 1
+            return next_id
+
+    def _scan_next_input_id(self) -> int:
+        """Return one past the highest logged input ID, creating the log if missing."""
         if not os.path.exists(self.input_csv_path):
-            pd.DataFrame(columns=['InputID', 'Statement']).to_csv(
-                self.input_csv_path, index=False
-            )
+            with open(self.input_csv_path, "w", newline="", encoding="utf-8") as file:
+                csv.writer(file, lineterminator=os.linesep).writerow(('InputID', 'Statement'))
             return 1
 
-        input_df = pd.read_csv(self.input_csv_path)
-        if input_df.empty:
-            return 1
-        return input_df['InputID'].astype(int).max() + 1
+        # Buffered rows must be on disk before the file is read
+        if self._input_file is not None:
+            self._input_file.flush()
+            self._pending_inputs = 0
+
+        with open(self.input_csv_path, newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            next(reader, None)  # Header
+            return max((int(row[0]) for row in reader if row and row[0].isdigit()), default=0) + 1
 
     def log_input(self, input_id: int, statement: str) -> None:
         """
         Log user input to CSV.
         
+        Rows go through a buffered append handle kept open on the logger and
+        are flushed every INPUT_FLUSH_EVERY rows and on close().
+        
         Args:
             input_id: Unique input identifier
             statement: User's input statement
         """
-        input_df = pd.DataFrame({
-            'InputID': [input_id],
-            'Statement': [statement]
-        })
-        input_df.to_csv(
-            self.input_csv_path, index=False, mode='a', header=False
-        )
+        if self._input_writer is None:
+            self._input_file = open(
+                self.input_csv_path, "a", newline="", encoding="utf-8", buffering=8192
+            )
+            self._input_writer = csv.writer(self._input_file, lineterminator=os.linesep)
+        self._input_writer.writerow((input_id, statement))
+        self._pending_inputs += 1
+        if self._pending_inputs >= self.INPUT_FLUSH_EVERY:
+            self._input_file.flush()
+            self._pending_inputs = 0
 
-    def log_output(self, output_df: pd.DataFrame) -> None:
+    def log_output(self, output_df: "pd.DataFrame") -> None:
         """
         Log agent outputs to CSV.
         
         Args:
-            output_df: DataFrame containing output entries
+            output_df: DataFrame containing output entries, e.g. from
+                build_output_df()
         """
-        output_df.to_csv(
-            self.output_csv_path, index=False, mode='a'
-        )
+        if self._output_writer is None:
+            self._output_file = open(
+                self.output_csv_path, "a", newline="", encoding="utf-8", buffering=64 * 1024
+            )
+            self._output_writer = csv.writer(self._output_file, lineterminator=os.linesep)
+            # Write the header only when starting a new file
+            if self._output_file.tell() == 0:
+                self._output_writer.writerow(self.OUTPUT_COLUMNS)
+        # The stdlib writer formats rows in C, unlike DataFrame.to_csv
+        self._output_writer.writerows(output_df.itertuples(index=False, name=None))
+        # One write per query, so the log stays current
+        self._output_file.flush()
 
     def add_output_record(
         self,
-        output_df: pd.DataFrame,
+        records: list,
         input_id: int,
         sequence_number: int,
         agent_name: str,
         output_content: str
-    ) -> pd.DataFrame:
+    ) -> None:
         """
-        Add a single output record to the dataframe.
+        Append a single output record to a list of records.
+        
+        Records are plain tuples in OUTPUT_COLUMNS order.
         
         Args:
-            output_df: Existing output dataframe
+            records: List of output records, built into a DataFrame once
+                with build_output_df()
             input_id: Unique input identifier
             sequence_number: Sequence number in conversation
             agent_name: Name of the agent
             output_content: Content of the output
+        """
+        records.append((input_id, sequence_number, agent_name, output_content))
+
+    def build_output_df(self, records: list) -> "pd.DataFrame":
+        """
+        Build the output dataframe from collected records in one step.
+        
+        Args:
+            records: List of records from add_output_record()
             
         Returns:
-            Updated dataframe
+            DataFrame with one row per record
         """
-        new_record = pd.DataFrame({
-            'InputID': [input_id],
-            'SequenceNumber': [sequence_number],
-            'AgentName': [agent_name],
-            'Output': [output_content]
-        })
-        return pd.concat([output_df, new_record], ignore_index=True)
+        import pandas as pd
+
+        return pd.DataFrame.from_records(records, columns=self.OUTPUT_COLUMNS)
 
     def log_token_usage(
         self,
         input_id: int,
-        prompt_agent_tokens: int,
-        parse_tokens: int,
-        forecast_tokens: int,
-        history_tokens: int,
-        solution_tokens: int,
-        reviewer_tokens: int,
-        total_tokens: int,
-        total_prompt_tokens: int,
-        total_completion_tokens: int,
+        summary: dict,
         total_cost: float
     ) -> None:
         """
         Log token usage and cost information.
         
+        Writes through a buffered append handle kept open on the logger;
+        call close() when done to flush it.
+        
         Args:
             input_id: Unique input identifier
-            prompt_agent_tokens: Tokens used by PromptAgent
-            parse_tokens: Tokens used by ParseAgent
-            forecast_tokens: Tokens used by ForecastAgent
-            history_tokens: Tokens used by WeatherHistoryAgent
-            solution_tokens: Tokens used by SolutionAgent
-            reviewer_tokens: Tokens used by ReviewerAgent
-            total_tokens: Total tokens used
-            total_prompt_tokens: Total prompt tokens
-            total_completion_tokens: Total completion tokens
+            summary: Token summary from TokenTracker.get_summary()
             total_cost: Total cost in USD
         """
-        token_data = f"""
-Input: {input_id}
-PromptAgent tokens: {prompt_agent_tokens}
-ParseAgent tokens: {parse_tokens}
-ForecastAgent tokens: {forecast_tokens}
-WeatherHistoryAgent tokens: {history_tokens}
-SolutionAgent tokens: {solution_tokens}
-ReviewerAgent tokens: {reviewer_tokens}
-Total tokens: {total_tokens}
-Total prompt tokens: {total_prompt_tokens}
-Total completion tokens: {total_completion_tokens}
-Total cost (USD): ${total_cost:.6f}
-"""
-        with open(self.tokens_txt_path, "a") as file:
-            file.write(token_data)
+        if self._token_file is None:
+            self._token_file = open(self.tokens_txt_path, "a", buffering=64 * 1024)
+        self._token_file.write(_TOKEN_TEMPLATE(input_id=input_id, total_cost=total_cost, **summary))
+
+    def close(self) -> None:
+        """Flush and close any open log file handles."""
+        if self._token_file is not None:
+            self._token_file.close()
+            self._token_file = None
+        if self._input_file is not None:
+            self._input_file.close()
+            self._input_file = None
+            self._input_writer = None
+            self._pending_inputs = 0
+        if self._output_file is not None:
+            self._output_file.close()
+            self._output_file = None
+            self._output_writer = None
 
 
 class TokenTracker:
     """Track token usage across agents."""
 
+    # Fixed counter slot per agent, in get_summary() order
+    AGENT_INDEX = {
+        'PromptAgent': 0,
+        'ParseAgent': 1,
+        'ForecastAgent': 2,
+        'WeatherHistoryAgent': 3,
+        'SolutionAgent': 4,
+        'ReviewerAgent': 5,
+    }
+    SUMMARY_KEYS = (
+        'prompt_agent_tokens',
+        'parse_tokens',
+        'forecast_tokens',
+        'history_tokens',
+        'solution_tokens',
+        'reviewer_tokens',
+    )
+    # Agents served by the gpt-4o-mini ("mini") service, priced separately
+    MINI_AGENTS = frozenset({'ParseAgent'})
+
     def __init__(self):
         """Initialize token tracking."""
-        self.prompt_agent_tokens = 0
-        self.parse_tokens = 0
-        self.forecast_tokens = 0
-        self.history_tokens = 0
-        self.solution_tokens = 0
-        self.reviewer_tokens = 0
+        # Per-agent prompt and completion counts, indexed by AGENT_INDEX
+        self._prompt = array('q', bytes(8 * len(self.AGENT_INDEX)))
+        self._completion = array('q', bytes(8 * len(self.AGENT_INDEX)))
         self.total_tokens = 0
         self.total_prompt_tokens = 0
         self.total_completion_tokens = 0
+        self.mini_prompt_tokens = 0
+        self.mini_completion_tokens = 0
+
+    def reset(self) -> None:
+        """Zero all counters in place."""
+        for index in range(len(self._prompt)):
+            self._prompt[index] = 0
+            self._completion[index] = 0
+        self.total_tokens = 0
+        self.total_prompt_tokens = 0
+        self.total_completion_tokens = 0
+        self.mini_prompt_tokens = 0
+        self.mini_completion_tokens = 0
 
     def update_agent_tokens(
         self,
@@ -169,27 +276,23 @@ class TokenTracker:
         """
         Update token counts for a specific agent.
         
+        Tokens from agents without a slot (e.g. VisionCropAgent) only
+        count towards the totals.
+        
         Args:
             agent_name: Name of the agent
             prompt_tokens: Number of prompt tokens
             completion_tokens: Number of completion tokens
         """
-        total_tokens = prompt_tokens + completion_tokens
-
-        if agent_name == "PromptAgent":
-            self.prompt_agent_tokens += total_tokens
-        elif agent_name == "ParseAgent":
-            self.parse_tokens += total_tokens
-        elif agent_name == "ForecastAgent":
-            self.forecast_tokens += total_tokens
-        elif agent_name == "WeatherHistoryAgent":
-            self.history_tokens += total_tokens
-        elif agent_name == "SolutionAgent":
-            self.solution_tokens += total_tokens
-        elif agent_name == "ReviewerAgent":
-            self.reviewer_tokens += total_tokens
-
-        self.total_tokens += total_tokens
+        index = self.AGENT_INDEX.get(agent_name)
+        if index is not None:
+            self._prompt[index] += prompt_tokens
+            self._completion[index] += completion_tokens
+        if agent_name in self.MINI_AGENTS:
+            self.mini_prompt_tokens += prompt_tokens
+            self.mini_completion_tokens += completion_tokens
+
+        self.total_tokens += prompt_tokens + completion_tokens
         self.total_prompt_tokens += prompt_tokens
         self.total_completion_tokens += completion_tokens
 
@@ -200,14 +303,13 @@ class TokenTracker:
         Returns:
             Dictionary containing token counts and totals
         """
-        return {
-            'prompt_agent_tokens': self.prompt_agent_tokens,
-            'parse_tokens': self.parse_tokens,
-            'forecast_tokens': self.forecast_tokens,
-            'history_tokens': self.history_tokens,
-            'solution_tokens': self.solution_tokens,
-            'reviewer_tokens': self.reviewer_tokens,
-            'total_tokens': self.total_tokens,
-            'total_prompt_tokens': self.total_prompt_tokens,
-            'total_completion_tokens': self.total_completion_tokens
+        summary = {
+            key: self._prompt[index] + self._completion[index]
+            for index, key in enumerate(self.SUMMARY_KEYS)
         }
+        summary['total_tokens'] = self.total_tokens
+        summary['total_prompt_tokens'] = self.total_prompt_tokens
+        summary['total_completion_tokens'] = self.total_completion_tokens
+        summary['mini_prompt_tokens'] = self.mini_prompt_tokens
+        summary['mini_completion_tokens'] = self.mini_completion_tokens
+        return summary
@@ -0,0 +1,91 @@
+"""Tests for the rule-based agent selection and termination in src.agent_manager."""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.contents import AuthorRole, ChatMessageContent
+from semantic_kernel.functions import KernelFunctionFromPrompt
+from semantic_kernel.kernel import Kernel
+
+from src.agent_manager import (
+    INTENT_AGENTS,
+    RuleBasedSelectionStrategy,
+    RuleBasedTerminationStrategy,
+)
+
+AGENT_NAMES = (
+    "PromptAgent",
+    "ParseAgent",
+    "ForecastAgent",
+    "WeatherHistoryAgent",
+    "SolutionAgent",
+    "VisionCropAgent",
+    "ReviewerAgent",
+)
+APPROVED = "Looks good. This solution is completely approved."
+COMPLETE = "Here is your answer. This conversation is complete."
+
+
+@pytest.fixture(scope="module")
+def agents() -> list:
+    kernel = Kernel()
+    return [ChatCompletionAgent(kernel=kernel, name=name, instructions="-") for name in AGENT_NAMES]
+
+
+def _strategy(intent: str) -> RuleBasedSelectionStrategy:
+    strategy = RuleBasedSelectionStrategy(
+        function=KernelFunctionFromPrompt(function_name="selection", prompt="{{$history}}"),
+        kernel=Kernel(),
+    )
+    strategy.intent = intent
+    return strategy
+
+
+def _history(*turns) -> list:
+    """Build a history from (name, content) agent turns after the user input."""
+    history = [ChatMessageContent(role=AuthorRole.USER, content="question")]
+    for name, content in turns:
+        history.append(ChatMessageContent(role=AuthorRole.ASSISTANT, name=name, content=content))
+    return history
+
+
+@pytest.mark.parametrize("intent, worker", sorted(INTENT_AGENTS.items()))
+def test_selection_follows_flow(agents, intent, worker) -> None:
+    """PromptAgent -> worker -> ReviewerAgent, looping until approval, then PromptAgent."""
+    strategy = _strategy(intent)
+    steps = [
+        (_history(), "PromptAgent"),
+        (_history(("PromptAgent", "Working on it")), worker),
+        (_history(("PromptAgent", "Working on it"), (worker, "draft")), "ReviewerAgent"),
+        (_history(("PromptAgent", "Working on it"), (worker, "draft"),
+                  ("ReviewerAgent", "Add dosage.")), worker),
+        (_history(("PromptAgent", "Working on it"), (worker, "draft"),
+                  ("ReviewerAgent", "Add dosage."), (worker, "draft 2")), "ReviewerAgent"),
+        (_history(("PromptAgent", "Working on it"), (worker, "draft"),
+                  ("ReviewerAgent", APPROVED)), "PromptAgent"),
+    ]
+    for history, expected in steps:
+        selected = asyncio.run(strategy.select_agent(agents, history))
+        assert selected.name == expected
+
+
+def test_termination_needs_approval_and_completion(agents) -> None:
+    """The chat ends only on PromptAgent's completion after ReviewerAgent approved."""
+    prompt_agent = agents[0]
+    strategy = RuleBasedTerminationStrategy(agents=[prompt_agent])
+
+    approved = _history(("ForecastAgent", "draft"), ("ReviewerAgent", APPROVED), ("PromptAgent", COMPLETE))
+    unapproved = _history(("ForecastAgent", "draft"), ("PromptAgent", COMPLETE))
+    open_ended = _history(("ForecastAgent", "draft"), ("ReviewerAgent", APPROVED), ("PromptAgent", "Thinking"))
+
+    assert asyncio.run(strategy.should_agent_terminate(prompt_agent, approved))
+    assert not asyncio.run(strategy.should_agent_terminate(prompt_agent, unapproved))
+    assert not asyncio.run(strategy.should_agent_terminate(prompt_agent, open_ended))
+    assert not asyncio.run(strategy.should_agent_terminate(prompt_agent, []))
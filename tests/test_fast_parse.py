@@ -0,0 +1,47 @@
+"""Tests for the rule-based forecast parser in src.utils.fast_parse."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.fast_parse import fast_parse
+
+
+@pytest.mark.parametrize("text, location, forecast_date", [
+    ("weather in Pune tomorrow", "Pune", 1),
+    ("What's the weather in Nashik today?", "Nashik", 0),
+    ("forecast tomorrow for Pune", "Pune", 1),
+    ("weather forecast for Navi Mumbai day after tomorrow", "Navi Mumbai", 2),
+    ("weather in Pune day after tomorrow", "Pune", 2),
+    ("forecast day after tomorrow for Pune", "Pune", 2),
+    ("How is the weather at Ludhiana, Punjab in 3 days", "Ludhiana, Punjab", 3),
+    ("weather  in Indore   5 days from now!", "Indore", 5),
+])
+def test_plain_forecast_requests(text, location, forecast_date) -> None:
+    """Supported phrasings map to a weather_forecast parse result."""
+    assert fast_parse(text) == {
+        "user_intent": "weather_forecast",
+        "location": location,
+        "start_year": 2015,
+        "end_year": 2025,
+        "forecast_date": forecast_date,
+        "has_image": False,
+    }
+
+
+@pytest.mark.parametrize("text", [
+    "weather in my farm tomorrow",
+    "weather for the field today",
+    "weather in Pune tomorrow and should I spray my wheat",
+    "What was the rainfall in Pune from 2015 to 2020?",
+    "My tomato leaves have yellow spots",
+    "weather in Pune",
+    "",
+])
+def test_everything_else_falls_through(text) -> None:
+    """Anything beyond a plain forecast request is left to the ParseAgent."""
+    assert fast_parse(text) is None
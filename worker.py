@@ -0,0 +1,82 @@
+"""
+Celery worker for running KhetSetu queries outside the API process.
+
+The /ask-async endpoint in backend_api.py enqueues queries here and returns
+immediately, so long multi-agent LLM runs never hold an HTTP worker slot.
+
+Installation:
+    pip install "celery[redis]"
+
+Usage:
+    celery -A worker worker --loglevel=info
+"""
+
+import asyncio
+import os
+from typing import Optional
+from celery import Celery
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+celery_app = Celery(
+    "khetsetu",
+    broker=os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0"),
+    backend=os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/1"),
+)
+celery_app.conf.update(
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    result_expires=3600,
+)
+
+# One event loop per worker process: the pooled HTTP client in
+# kernel_functions binds its connections to the loop that first uses them,
+# so a fresh asyncio.run() per task would strand them. The KhetSetu
+# instance is likewise built once per process and reused across tasks.
+_loop = None
+_khet_setu_system = None
+
+
+def _run(coro):
+    """Run a coroutine on this process's persistent event loop."""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
+@celery_app.task(bind=True, max_retries=3)
+def run_khetsetu(
+    self,
+    user_input: str,
+    image_base64: Optional[str] = None,
+    image_url: Optional[str] = None
+) -> dict:
+    """
+    Run a KhetSetu web query to completion.
+
+    Args:
+        user_input: The user's agricultural query
+        image_base64: Optional base64-encoded image data (without data: prefix)
+        image_url: Optional public URL to an image
+
+    Returns:
+        Dictionary matching the /ask response contract
+    """
+    global _khet_setu_system
+    # Import here so the worker module stays importable by the API process
+    from main import KhetSetu
+
+    try:
+        if _khet_setu_system is None:
+            _khet_setu_system = KhetSetu()
+        return _run(_khet_setu_system.process_web_query(
+            user_input,
+            image_base64=image_base64,
+            image_url=image_url
+        ))
+    except Exception as e:
+        raise self.retry(exc=e, countdown=5)